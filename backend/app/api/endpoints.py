@@ -1,11 +1,27 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple, Union
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
 import json
+import time
 
-from app.services.ai_engine import analyze_documents as ai_analyze
-from app.services.ocr import extract_text_from_image, process_document
-from app.services.blockchain import store_evidence, retrieve_evidence
+from app.core.concurrency import run_in_stage
+from app.core.config import settings
+from app.services.ai_engine import (
+    analyze_documents as ai_analyze, analyze_documents_stream as ai_analyze_stream, ANALYSIS_MODES
+)
+from app.services.ocr import get_ocr_stats, process_document
+from app.services.blockchain import (
+    chain_health, get_evidence_status, retrieve_evidence, store_evidence, verify_evidence,
+    verify_evidence_bulk
+)
+from app.services.llm_client import get_llm_client
+from app.services.blob_store import canonical_json, get_blob_store
+from app.services.cache import cache_stats
+from app.services.ipc_index import get_ipc_index
+from app.services.ipc_retriever import retriever_stats
+from app.services.diff import diff_texts, GRANULARITIES
+from app.services.uploads import RequestBudget, SpooledUpload, UploadTooLarge, spool_upload
 
 router = APIRouter()
 
@@ -20,76 +36,203 @@ async def health_check():
     }
 
 
+@router.get("/stats")
+async def stats_endpoint():
+    """Runtime counters for the shared service clients"""
+    return {
+        "status": "success",
+        "llm": get_llm_client().stats(),
+        "caches": cache_stats(),
+        "ocr": get_ocr_stats(),
+        "retrieval": retriever_stats(),
+        "chain": chain_health()
+    }
+
+
+async def _spool_files(files: List[UploadFile]) -> List[Tuple[str, Union[SpooledUpload, Exception]]]:
+    """Spool every upload under one request budget before OCR starts."""
+    budget = RequestBudget(settings.max_upload_request_bytes)
+    spooled = []
+    try:
+        for file in files:
+            try:
+                spooled.append((file.filename, await spool_upload(file, budget)))
+            except UploadTooLarge:
+                raise
+            except Exception as e:
+                spooled.append((file.filename, e))
+    except UploadTooLarge:
+        for _, item in spooled:
+            if isinstance(item, SpooledUpload):
+                item.close()
+        raise
+    return spooled
+
+
+async def _ocr_upload(filename: str, spooled: Union[SpooledUpload, Exception]) -> Dict[str, Any]:
+    """OCR one spooled upload on the worker pool and build its result entry."""
+    if isinstance(spooled, Exception):
+        return {
+            "filename": filename,
+            "status": "error",
+            "message": str(spooled)
+        }
+    try:
+        # Extract text from file
+        ocr = asyncio.ensure_future(
+            run_in_stage("ocr", process_document, spooled.open(), spooled.file_type, spooled.sha256)
+        )
+        try:
+            text = await asyncio.shield(ocr)
+        except asyncio.CancelledError:
+            # The worker thread is still reading the spool; let it finish before closing
+            await asyncio.gather(ocr, return_exceptions=True)
+            raise
+        
+        return {
+            "filename": filename,
+            "text": text,
+            "sha256": spooled.sha256,
+            "size": spooled.size,
+            "status": "success"
+        }
+    except Exception as e:
+        return {
+            "filename": filename,
+            "status": "error",
+            "message": str(e)
+        }
+    finally:
+        spooled.close()
+
+
 @router.post("/upload")
 async def upload_files(files: list[UploadFile] = File(...)):
     """
     Upload and process documents (images or PDFs).
-    Extracts text using OCR.
+    Files are streamed to spooled temp files and hashed on the fly;
+    extracts text using OCR, processing the files concurrently.
     """
     try:
-        results = []
-        for file in files:
-            try:
-                content = await file.read()
-                
-                # Determine file type
-                file_type = "pdf" if file.filename.endswith(".pdf") else "image"
-                
-                # Extract text from file
-                text = process_document(content, file_type)
-                
-                results.append({
-                    "filename": file.filename,
-                    "text": text,
-                    "status": "success"
-                })
-            except Exception as e:
-                results.append({
-                    "filename": file.filename,
-                    "status": "error",
-                    "message": str(e)
-                })
+        spooled = await _spool_files(files)
+        results = await asyncio.gather(*(_ocr_upload(name, item) for name, item in spooled))
         
         return {
             "status": "success",
-            "uploaded": results,
+            "uploaded": list(results),
             "count": len(results)
         }
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/upload/stream")
+async def upload_files_stream(files: list[UploadFile] = File(...)):
+    """
+    Upload and process documents, streaming results as NDJSON.
+    Each file's result is emitted as soon as its OCR finishes, tagged with
+    its position in the request; a final summary line closes the stream.
+    """
+    try:
+        spooled = await _spool_files(files)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    async def indexed(index: int, filename: str, item):
+        result = await _ocr_upload(filename, item)
+        result["index"] = index
+        return result
+    
+    async def frames():
+        tasks = [asyncio.ensure_future(indexed(i, name, item)) for i, (name, item) in enumerate(spooled)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield json.dumps({"type": "file", **(await task)}) + "\n"
+            yield json.dumps({"type": "summary", "status": "success", "count": len(tasks)}) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Tasks cancelled before they started never ran their own cleanup
+            for _, item in spooled:
+                if isinstance(item, SpooledUpload):
+                    item.close()
+    
+    return StreamingResponse(frames(), media_type="application/x-ndjson")
+
+
+def _analyze_inputs(request_data: Dict[str, Any]):
+    fir_text = request_data.get("fir_text", "")
+    witness_statements = request_data.get("witness_statements", [])
+    mode = request_data.get("mode", "combined")
+    
+    # Backward compatibility for single witness text
+    if not witness_statements and request_data.get("witness_text"):
+        witness_statements = [request_data.get("witness_text")]
+    
+    if not fir_text or not witness_statements:
+        raise HTTPException(
+            status_code=400,
+            detail="fir_text and at least one witness statement are required"
+        )
+    
+    if mode not in ANALYSIS_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"mode must be one of: {', '.join(ANALYSIS_MODES)}"
+        )
+    return fir_text, witness_statements, mode
+
+
+async def _queue_evidence(report: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Queue a report for the chain and describe where its evidence stands.
+    Anchoring happens in the background, so tx_hash is normally still
+    None here; poll /evidence/{evidence_id} for it. Failed analyses are
+    not evidence and are never anchored.
+    """
+    if report.get("status", "success") != "success":
+        return {
+            "evidence_id": None,
+            "evidence_status": "skipped",
+            "evidence_digest": None,
+            "tx_hash": None,
+            "stored_on_blockchain": False
+        }
+    evidence_id = await run_in_stage("chain", store_evidence, canonical_json(report))
+    record = await run_in_stage("chain", get_evidence_status, evidence_id) if evidence_id else None
+    status = record["status"] if record else "failed"
+    return {
+        "evidence_id": evidence_id or None,
+        "evidence_status": status,
+        "evidence_digest": record.get("digest") if record else None,
+        "tx_hash": record.get("tx_hash") if record else None,
+        "stored_on_blockchain": status in ("mined", "confirmed")
+    }
+
+
 @router.post("/analyze")
 async def analyze_endpoint(request_data: Dict[str, Any]):
     """
     Analyze FIR and witness statements for discrepancies.
-    Stores evidence on blockchain.
+    Queues evidence for blockchain storage and returns its evidence ID
+    and digest.
     """
     try:
-        fir_text = request_data.get("fir_text", "")
-        witness_statements = request_data.get("witness_statements", [])
-        
-        # Backward compatibility for single witness text
-        if not witness_statements and request_data.get("witness_text"):
-            witness_statements = [request_data.get("witness_text")]
-        
-        if not fir_text or not witness_statements:
-            raise HTTPException(
-                status_code=400,
-                detail="fir_text and at least one witness statement are required"
-            )
+        fir_text, witness_statements, mode = _analyze_inputs(request_data)
         
-        # Analyze documents
-        analysis = ai_analyze(fir_text, witness_statements)
+        # Analyze documents (blocking Gemini call runs off the event loop)
+        analysis = await run_in_stage("ai", ai_analyze, fir_text, witness_statements, mode)
         
-        # Store evidence on blockchain
-        tx_hash = store_evidence(json.dumps(analysis))
+        # Queue evidence for the chain; poll /evidence/{evidence_id} for its status
+        evidence = await _queue_evidence(analysis)
         
         return {
             "status": "success",
             "analysis": analysis,
-            "tx_hash": tx_hash,
-            "stored_on_blockchain": bool(tx_hash)
+            **evidence
         }
     except HTTPException:
         raise
@@ -97,39 +240,120 @@ async def analyze_endpoint(request_data: Dict[str, Any]):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/analyze/stream")
+async def analyze_stream_endpoint(request_data: Dict[str, Any]):
+    """
+    Analyze FIR and witness statements, streaming each discrepancy as soon
+    as it is found. Frames are NDJSON lines, or Server-Sent Events when
+    'format' is 'sse'. A final summary frame carries the similarity score,
+    confidence and the evidence ID of the stored report. If the analysis
+    fails, an error frame replaces the summary and the discrepancies already
+    sent should be discarded; nothing is stored as evidence.
+    """
+    fir_text, witness_statements, mode = _analyze_inputs(request_data)
+    stream_format = request_data.get("format", "ndjson")
+    if stream_format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be one of: ndjson, sse")
+    
+    def frame(kind: str, payload: Dict[str, Any]) -> str:
+        data = json.dumps({"type": kind, **payload})
+        return f"event: {kind}\ndata: {data}\n\n" if stream_format == "sse" else data + "\n"
+    
+    async def frames():
+        events = ai_analyze_stream(fir_text, witness_statements, mode)
+        started = time.perf_counter()
+        first_ms = None
+        count = 0
+        try:
+            while True:
+                # Each step runs off the event loop; the generator blocks on the model stream
+                event = await run_in_stage("ai", next, events, None)
+                if event is None:
+                    return
+                kind, payload = event
+                if kind == "discrepancy":
+                    if first_ms is None:
+                        first_ms = (time.perf_counter() - started) * 1000
+                    yield frame("discrepancy", {"index": count, "discrepancy": payload})
+                    count += 1
+                    continue
+                
+                if payload.get("status", "success") != "success":
+                    yield frame("error", {
+                        "status": "error",
+                        "message": payload.get("message"),
+                        "discarded_discrepancies": count,
+                        "total_ms": round((time.perf_counter() - started) * 1000, 2)
+                    })
+                    return
+                
+                evidence = await _queue_evidence(payload)
+                yield frame("summary", {
+                    "status": "success",
+                    "message": payload.get("message"),
+                    "discrepancies_count": count,
+                    "similarity_score": payload.get("similarity_score"),
+                    "confidence": payload.get("confidence"),
+                    "recommendations": payload.get("recommendations", []),
+                    "applicable_sections": payload.get("applicable_sections", []),
+                    "legal_context": payload.get("legal_context", []),
+                    **evidence,
+                    "first_discrepancy_ms": round(first_ms, 2) if first_ms is not None else None,
+                    "total_ms": round((time.perf_counter() - started) * 1000, 2)
+                })
+        finally:
+            try:
+                events.close()
+            except ValueError:
+                # Still running a step in a worker thread; it is collected when that returns
+                pass
+    
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(frames(), media_type=media_type)
+
+
+def _compare_inputs(request_data: Dict[str, Any]):
+    text1 = request_data.get("text1", "")
+    text2 = request_data.get("text2", "")
+    granularity = request_data.get("granularity", "line")
+    
+    if not text1 or not text2:
+        raise HTTPException(
+            status_code=400,
+            detail="Both text1 and text2 are required"
+        )
+    if granularity not in GRANULARITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"granularity must be one of: {', '.join(GRANULARITIES)}"
+        )
+    return text1, text2, granularity
+
+
 @router.post("/compare")
-async def compare_endpoint(request_data: Dict[str, str]):
-    """Compare two text inputs for differences"""
+async def compare_endpoint(request_data: Dict[str, Any]):
+    """
+    Compare two text inputs for differences.
+    Results are paged with 'offset' and 'limit' for very large documents.
+    """
     try:
-        text1 = request_data.get("text1", "")
-        text2 = request_data.get("text2", "")
-        
-        if not text1 or not text2:
-            raise HTTPException(
-                status_code=400,
-                detail="Both text1 and text2 are required"
-            )
-        
-        # Simple line-by-line comparison
-        lines1 = text1.split("\n")
-        lines2 = text2.split("\n")
-        
-        differences = []
-        for i, (l1, l2) in enumerate(zip(lines1, lines2)):
-            if l1 != l2:
-                differences.append({
-                    "line": i + 1,
-                    "text1": l1,
-                    "text2": l2
-                })
+        text1, text2, granularity = _compare_inputs(request_data)
+        offset = max(0, int(request_data.get("offset", 0)))
+        limit = max(1, int(request_data.get("limit", 500)))
         
-        similarity = 1 - (len(differences) / max(len(lines1), len(lines2))) if max(len(lines1), len(lines2)) > 0 else 1
+        result = await run_in_stage("diff", diff_texts, text1, text2, granularity)
+        differences = result["differences"]
+        page = differences[offset:offset + limit]
+        next_offset = offset + limit if offset + limit < len(differences) else None
         
         return {
             "status": "success",
-            "similarity_score": similarity,
+            "granularity": granularity,
+            "similarity_score": result["similarity_score"],
             "differences_count": len(differences),
-            "differences": differences
+            "differences": page,
+            "offset": offset,
+            "next_offset": next_offset
         }
     except HTTPException:
         raise
@@ -137,31 +361,182 @@ async def compare_endpoint(request_data: Dict[str, str]):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/compare/stream")
+async def compare_stream_endpoint(request_data: Dict[str, Any]):
+    """
+    Compare two text inputs and stream the result as NDJSON.
+    The first line is a summary; each following line is one difference.
+    """
+    text1, text2, granularity = _compare_inputs(request_data)
+    result = await run_in_stage("diff", diff_texts, text1, text2, granularity)
+    
+    def frames():
+        yield json.dumps({
+            "type": "summary",
+            "granularity": granularity,
+            "similarity_score": result["similarity_score"],
+            "differences_count": len(result["differences"])
+        }) + "\n"
+        for difference in result["differences"]:
+            yield json.dumps({"type": "difference", **difference}) + "\n"
+    
+    return StreamingResponse(frames(), media_type="application/x-ndjson")
+
+
+@router.get("/ipc/sections/{section_number}")
+async def get_ipc_section_endpoint(section_number: str):
+    """Look up an IPC section by number from the in-memory index"""
+    chunks = get_ipc_index().lookup(section_number)
+    if not chunks:
+        raise HTTPException(status_code=404, detail=f"IPC section {section_number} not found")
+    return {
+        "status": "success",
+        "section": section_number,
+        "chunks": chunks
+    }
+
+
+@router.post("/ipc/search")
+async def search_ipc_endpoint(request_data: Dict[str, Any]):
+    """
+    Rank IPC sections for free text with BM25 and detect cited sections.
+    Runs entirely in memory.
+    """
+    query = request_data.get("query", "")
+    k = request_data.get("k", 5)
+    if not query:
+        raise HTTPException(status_code=400, detail="query is required")
+    if not isinstance(k, int) or not 1 <= k <= 50:
+        raise HTTPException(status_code=400, detail="k must be an integer between 1 and 50")
+    
+    index = get_ipc_index()
+    return {
+        "status": "success",
+        "citations": index.detect_citations(query),
+        "sections": index.hybrid_search(query, k)
+    }
+
+
 @router.post("/extract-text")
 async def extract_text_endpoint(file: UploadFile = File(...)):
     """Extract text from a single image file"""
+    spooled = None
     try:
-        content = await file.read()
-        text = extract_text_from_image(content)
+        spooled = await spool_upload(file)
+        text = await run_in_stage("ocr", process_document, spooled.open(), "image", spooled.sha256)
         
         return {
             "status": "success",
             "filename": file.filename,
-            "text": text
+            "text": text,
+            "sha256": spooled.sha256
         }
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        if spooled is not None:
+            spooled.close()
+
+
+@router.post("/evidence/verify-proof")
+async def verify_proof_endpoint(request_data: Dict[str, Any]):
+    """Verify an evidence digest's Merkle proof against its anchored root"""
+    digest = request_data.get("digest", "")
+    root = request_data.get("root", "")
+    proof = request_data.get("proof", [])
+    
+    if not digest or not root or not isinstance(proof, list):
+        raise HTTPException(
+            status_code=400,
+            detail="digest, root and a proof list are required"
+        )
+    
+    result = await run_in_stage("chain", verify_evidence, digest, proof, root)
+    if result.get("status") == "error":
+        raise HTTPException(status_code=400, detail=result["message"])
+    return result
+
+
+@router.post("/evidence/verify")
+async def verify_evidence_bulk_endpoint(request_data: Dict[str, Any]):
+    """
+    Verify many evidence digests in one call.
+    Answers from the local evidence index and checks only unknown roots on
+    chain, in JSON-RPC batches.
+    """
+    items = request_data.get("items")
+    if items is None:
+        items = [{"digest": digest} for digest in request_data.get("digests", [])]
+    
+    if not items or not all(isinstance(item, dict) and item.get("digest") for item in items):
+        raise HTTPException(
+            status_code=400,
+            detail="Provide digests, or items each with a digest and optionally root and proof"
+        )
+    if len(items) > settings.max_bulk_verify_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.max_bulk_verify_items} items can be verified per request"
+        )
+    
+    try:
+        results = await run_in_stage("chain", verify_evidence_bulk, items)
     except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "status": "success",
+        "results": results,
+        "verified": sum(1 for result in results if result.get("verified")),
+        "from_index": sum(1 for result in results if result.get("source") == "index"),
+        "from_chain": sum(1 for result in results if result.get("source") == "chain")
+    }
+
+
+@router.get("/evidence/report/{digest}")
+async def get_evidence_report_endpoint(digest: str):
+    """Return a stored analysis report by its digest, with its chain verification"""
+    try:
+        blob = get_blob_store().get(digest)
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if blob is None:
+        raise HTTPException(status_code=404, detail="No report stored for this digest")
+    
+    verification = await run_in_stage("chain", verify_evidence, digest)
+    return {
+        "status": "success",
+        "digest": digest,
+        "report": json.loads(blob),
+        "verification": verification
+    }
 
 
-@router.get("/evidence/{tx_hash}")
-async def get_evidence_endpoint(tx_hash: str):
-    """Retrieve evidence from blockchain by transaction hash"""
+@router.get("/evidence/{evidence_id}")
+async def get_evidence_endpoint(evidence_id: str):
+    """
+    Report evidence status (queued, pending, mined, confirmed or failed)
+    by evidence ID, or retrieve evidence by transaction hash.
+    """
     try:
-        evidence = retrieve_evidence(tx_hash)
+        record = await run_in_stage("chain", get_evidence_status, evidence_id)
+        if record is not None:
+            return {
+                "status": "success",
+                "evidence_id": evidence_id,
+                "evidence": record
+            }
+        if not evidence_id.startswith("0x"):
+            raise HTTPException(status_code=404, detail="Unknown evidence ID")
+        
+        evidence = await run_in_stage("chain", retrieve_evidence, evidence_id)
         return {
             "status": "success",
-            "tx_hash": tx_hash,
+            "tx_hash": evidence_id,
             "evidence": evidence
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,90 @@
+"""
+Bounded execution of blocking work from async endpoints.
+Each pipeline stage (AI, chain, OCR) gets its own concurrency limit so a
+slow upstream cannot starve the others or block the event loop.
+"""
+
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from app.core.config import settings
+
+_executor: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def _stage_limits() -> Dict[str, int]:
+    return {
+        "ai": settings.ai_max_concurrency,
+        "chain": settings.chain_max_concurrency,
+        "ocr": settings.ocr_max_concurrency,
+        "diff": settings.diff_max_concurrency,
+    }
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the shared worker pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.worker_threads,
+            thread_name_prefix="nyaya-worker"
+        )
+    return _executor
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared CPU-bound worker processes (one per core by default)."""
+    global _process_pool
+    if _process_pool is None:
+        # Spawned, not forked: by now this process runs threads, gRPC channels
+        # and SQLite handles that a forked child would inherit mid-use
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.worker_processes or os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+def _get_semaphore(stage: str) -> asyncio.Semaphore:
+    semaphore = _semaphores.get(stage)
+    if semaphore is None:
+        limits = _stage_limits()
+        if stage not in limits:
+            raise ValueError(f"Unknown pipeline stage: {stage}")
+        semaphore = asyncio.Semaphore(limits[stage])
+        _semaphores[stage] = semaphore
+    return semaphore
+
+
+async def run_in_stage(stage: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking callable on the worker pool under a per-stage limit.
+
+    Args:
+        stage: Pipeline stage name ('ai', 'chain', 'ocr' or 'diff')
+        func: Blocking callable to run
+        *args, **kwargs: Arguments forwarded to the callable
+
+    Returns:
+        Whatever the callable returns
+    """
+    async with _get_semaphore(stage):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+def shutdown_executor() -> None:
+    """Stop the worker pools; called from the application lifespan."""
+    global _executor, _process_pool
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+    _semaphores.clear()
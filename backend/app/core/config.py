@@ -10,6 +10,133 @@ class Settings(BaseSettings):
     google_application_credentials: str = ""
     frontend_url: str = "http://localhost:5173"
 
+    # Concurrency limits for blocking pipeline stages
+    worker_threads: int = 64
+    worker_processes: int = 0
+    ai_max_concurrency: int = 32
+    chain_max_concurrency: int = 16
+    ocr_max_concurrency: int = 8
+    diff_max_concurrency: int = 4
+
+    # Upload streaming and size caps
+    upload_chunk_size: int = 1024 * 1024
+    upload_spool_memory_bytes: int = 1024 * 1024
+    max_upload_file_bytes: int = 50 * 1024 * 1024
+    max_upload_request_bytes: int = 200 * 1024 * 1024
+
+    # Vision micro-batching (batch_annotate_images accepts up to 16 images)
+    vision_batch_size: int = 16
+    vision_batch_window_ms: float = 5.0
+    vision_batch_max_bytes: int = 8 * 1024 * 1024
+    vision_max_inflight_batches: int = 4
+
+    # PDF extraction: text layer first, OCR only for image-only pages
+    pdf_min_text_chars: int = 20
+    pdf_ocr_dpi: int = 200
+    pdf_ocr_workers: int = 8
+    pdf_max_inflight_pages: int = 8
+
+    # OCR result cache keyed by document (and PDF page) content hash
+    ocr_cache_memory_entries: int = 512
+    ocr_cache_ttl_seconds: int = 30 * 24 * 3600
+    ocr_cache_max_disk_mb: int = 512
+
+    # Image preprocessing before OCR (runs in the shared process pool)
+    ocr_preprocess_enabled: bool = True
+    ocr_target_dpi: int = 200
+    ocr_jpeg_quality: int = 85
+    ocr_margin_threshold: int = 200
+
+    # OCR engine routing: 'auto' (local first, cloud on low confidence),
+    # 'vision' or 'tesseract'
+    ocr_backend: str = "auto"
+    ocr_min_local_confidence: float = 0.80
+    tesseract_lang: str = "eng+hin"
+
+    # Gemini client quota (0 disables a limit) and retry policy
+    gemini_model: str = "gemini-pro"
+    gemini_requests_per_minute: int = 60
+    gemini_tokens_per_minute: int = 120000
+    gemini_max_retries: int = 5
+    gemini_backoff_base: float = 1.0
+    gemini_backoff_max: float = 30.0
+
+    # Result caches (in-memory LRU in front of SQLite files in cache_dir)
+    cache_dir: str = "./cache"
+    analysis_cache_memory_entries: int = 256
+    analysis_cache_ttl_seconds: int = 7 * 24 * 3600
+    analysis_cache_max_disk_mb: int = 256
+
+    # Concurrent pair jobs for pairwise multi-witness analysis
+    pairwise_max_concurrency: int = 8
+
+    # IPC retrieval (RAG) for legal grounding of the analysis
+    rag_enabled: bool = True
+    rag_top_k: int = 3
+    rag_timeout_seconds: float = 5.0
+    rag_retry_seconds: float = 60.0
+    rag_max_concurrency: int = 4
+    rag_query_chars: int = 2000
+    rag_section_chars: int = 600
+    chroma_path: str = "./chroma_db"
+    # Base name; each embedding model gets its own <base>__<model> collection
+    ipc_collection: str = "ipc_data"
+    embedding_model: str = "models/text-embedding-004"
+
+    # In-memory lexical IPC index (empty path uses the bundled
+    # ipc_chunks_final.json) and its weight in hybrid ranking
+    ipc_data_path: str = ""
+    bm25_k1: float = 1.5
+    bm25_b: float = 0.75
+    rag_hybrid_alpha: float = 0.5
+
+    # Vector backend for IPC retrieval: "numpy" (memory-mapped matrix in
+    # vector_store_dir, built with the local hashing embedder if missing)
+    # or "chroma"
+    vector_backend: str = "numpy"
+    vector_store_dir: str = "./vector_store"
+    local_embedding_dim: int = 1024
+    embedding_cache_memory_entries: int = 1024
+
+    # Bulk ingestion: batches as large as one embedding call allows, with
+    # AIMD concurrency that backs off on 429s
+    ingest_batch_size: int = 100
+    ingest_initial_concurrency: int = 2
+    ingest_max_concurrency: int = 16
+    ingest_max_retries: int = 8
+
+    # Blockchain RPC connection pool and background health checks
+    rpc_pool_connections: int = 20
+    rpc_timeout_seconds: float = 10.0
+    chain_health_interval_seconds: float = 30.0
+
+    # Background transaction queue: gas bumping for stuck transactions and
+    # confirmations before evidence counts as final
+    tx_poll_interval_seconds: float = 2.0
+    tx_stuck_after_seconds: float = 60.0
+    tx_gas_bump_factor: float = 1.125
+    tx_max_gas_price_gwei: int = 500
+    tx_confirmations: int = 3
+    tx_jobs_max: int = 10000
+    evidence_records_max: int = 100000
+
+    # Local evidence index, contract event replay and JSON-RPC batching
+    evidence_index_path: str = "./evidence/index.sqlite3"
+    # Block to replay events from on a fresh index; 0 starts at the current head
+    contract_deploy_block: int = 0
+    event_sync_chunk_blocks: int = 2000
+    event_sync_max_chunks: int = 10
+    rpc_batch_size: int = 100
+    max_bulk_verify_items: int = 1000
+
+    # Evidence anchoring: 'merkle' writes one root per batch window,
+    # 'direct' registers every evidence digest in its own transaction.
+    # Full reports are kept in a local content-addressed blob store.
+    evidence_anchor_mode: str = "merkle"
+    evidence_blob_dir: str = "./evidence/blobs"
+    anchor_window_seconds: float = 2.0
+    anchor_max_leaves: int = 4096
+
     class Config:
         env_file = ".env"
 
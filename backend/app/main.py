@@ -1,10 +1,33 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.api.endpoints import router as api_router
 from app.core.config import settings
+from app.core.concurrency import get_executor, run_in_stage, shutdown_executor
+from app.services.blockchain import get_blockchain_service, shutdown_blockchain_service
+from app.services.ipc_retriever import warm_ipc_retriever
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start the shared worker pool and chain connection before serving requests
+    get_executor()
+    try:
+        await run_in_stage("chain", get_blockchain_service)
+    except Exception as e:
+        # Evidence storage degrades gracefully; the rest of the API still serves
+        print(f"Blockchain service unavailable: {e}")
+    # Open the IPC vector store once instead of on the first analysis
+    await run_in_stage("ai", warm_ipc_retriever)
+    yield
+    shutdown_blockchain_service()
+    shutdown_executor()
 
-app = FastAPI(title="Nyaya-Drishti Backend", version="1.0.0")
+
+app = FastAPI(title="Nyaya-Drishti Backend", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -15,6 +38,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def limit_request_size(request: Request, call_next):
+    # Reject oversized uploads from the declared length before reading the body
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.max_upload_request_bytes:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Request exceeds the {settings.max_upload_request_bytes} byte upload limit"}
+        )
+    return await call_next(request)
+
 # Include routers
 app.include_router(api_router, prefix="/api")
 
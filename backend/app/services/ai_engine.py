@@ -3,49 +3,168 @@ AI Engine for analyzing and comparing legal documents.
 Uses Google Generative AI (Gemini) for document analysis.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import json
-import google.generativeai as genai
-import chromadb
-from langchain_community.vectorstores import Chroma
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from app.core.config import settings
-import chromadb
-from langchain_community.vectorstores import Chroma
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from app.services.llm_client import get_llm_client
+from app.services.cache import get_cache, make_cache_key, normalize_text
+from app.services.fact_extractor import (
+    FACT_LABELS, check_consistency, compare_facts, extract_facts, format_known_discrepancies
+)
+from app.services.ipc_retriever import collect_retrieval, get_ipc_retriever, submit_retrieval
+from app.services.json_stream import StreamingArrayParser
+
+# Bump whenever the analysis prompt changes so cached results are not reused
+PROMPT_VERSION = "analysis-v3"
+PAIR_PROMPT_VERSION = "pair-v2"
+
+ANALYSIS_MODES = ("combined", "pairwise", "fast")
+
+_pair_executor: Optional[ThreadPoolExecutor] = None
+_pair_executor_lock = threading.Lock()
+
+
+def _analysis_cache():
+    return get_cache(
+        "analysis",
+        memory_entries=settings.analysis_cache_memory_entries,
+        ttl_seconds=settings.analysis_cache_ttl_seconds,
+        max_disk_bytes=settings.analysis_cache_max_disk_mb * 1024 * 1024
+    )
+
+
+def _pair_cache():
+    return get_cache(
+        "analysis_pairs",
+        memory_entries=settings.analysis_cache_memory_entries,
+        ttl_seconds=settings.analysis_cache_ttl_seconds,
+        max_disk_bytes=settings.analysis_cache_max_disk_mb * 1024 * 1024
+    )
+
+
+def _get_pair_executor() -> ThreadPoolExecutor:
+    global _pair_executor
+    if _pair_executor is None:
+        with _pair_executor_lock:
+            if _pair_executor is None:
+                _pair_executor = ThreadPoolExecutor(
+                    max_workers=settings.pairwise_max_concurrency,
+                    thread_name_prefix="nyaya-pair"
+                )
+    return _pair_executor
+
+
+def analysis_cache_key(fir_text: str, witness_statements: List[str]) -> str:
+    """Cache key over the normalized inputs, prompt version and model name."""
+    parts = [PROMPT_VERSION, settings.gemini_model, normalize_text(fir_text)]
+    parts.extend(normalize_text(stmt) for stmt in witness_statements)
+    return make_cache_key(parts)
 
-# Configure Gemini
-if settings.gemini_api_key:
-    genai.configure(api_key=settings.gemini_api_key)
-else:
-    print("Warning: GEMINI_API_KEY not found in settings")
 
 def _get_gemini_response_json(prompt: str) -> Dict[str, Any]:
-    """Helper to get JSON response from Gemini"""
-    try:
-        model = genai.GenerativeModel('gemini-pro')
-        response = model.generate_content(prompt)
-        
-        # Clean up the response text to ensure it's valid JSON
-        text = response.text.replace('```json', '').replace('```', '').strip()
-        
-        return json.loads(text)
-    except Exception as e:
-        print(f"Error calling Gemini: {e}")
-        return None
+    """Helper to get JSON response from Gemini through the shared client"""
+    return get_llm_client().generate_json(prompt)
+
 
-def analyze_documents(fir_text: str, witness_statements: List[str]) -> Dict[str, Any]:
+def _format_legal_context(sections: List[Dict[str, Any]]) -> str:
+    if not sections:
+        return "None retrieved."
+    return "\n".join(f"- Section {s['section']}: {s['text']}" for s in sections)
+
+def _combined_prompt(
+    fir_text: str,
+    witness_statements: List[str],
+    fact_report: Dict[str, Any],
+    retrieval: Dict[str, Any]
+) -> str:
+    witness_text_formatted = "\n\n".join([f"WITNESS {i+1}:\n{stmt}" for i, stmt in enumerate(witness_statements)])
+
+    return f"""
+    Act as a legal expert AI. Analyze the consistency between the following First Information Report (FIR) and multiple Witness Statements.
+    
+    FIR TEXT:
+    {fir_text}
+    
+    WITNESS STATEMENTS:
+    {witness_text_formatted}
+    
+    FACTUAL MISMATCHES ALREADY DETECTED (dates, times, vehicle numbers, amounts, counts, places):
+    {format_known_discrepancies(fact_report["discrepancies"])}
+    
+    RELEVANT IPC SECTIONS (retrieved for legal grounding):
+    {_format_legal_context(retrieval["sections"])}
+    
+    Task:
+    1. Compare each witness statement against the FIR for contradictions.
+    2. Compare witness statements against EACH OTHER for contradictions.
+    3. Identify missing details or discrepancies.
+    4. Note which of the IPC sections above the facts support, and where a contradiction weakens an ingredient of one.
+    Do not repeat the factual mismatches listed above; focus on contradictions in the narrative.
+    
+    Output the result ONLY in the following JSON format:
+    {{
+        "status": "success",
+        "discrepancies": [
+            {{
+                "source": "Witness 1 vs FIR" or "Witness 1 vs Witness 2",
+                "details": "Description of the discrepancy"
+            }}
+        ],
+        "similarity_score": <float between 0 and 1 indicating overall consistency>,
+        "recommendations": ["list of actionable recommendations"],
+        "applicable_sections": ["IPC section numbers the facts support"],
+        "confidence": <float between 0 and 1 representing confidence in this analysis>
+    }}
+    """
+
+
+def _finish_combined(
+    cache_key: str,
+    result: Dict[str, Any],
+    fact_report: Dict[str, Any],
+    retrieval: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Merge local fact mismatches and legal context into the model's answer and cache it."""
+    result["discrepancies"] = fact_report["discrepancies"] + result.get("discrepancies", [])
+    result["legal_context"] = [
+        {"section": s["section"], "title": s["title"]} for s in retrieval["sections"]
+    ]
+    result["retrieval"] = {
+        "status": retrieval["status"],
+        "retrieval_ms": round(retrieval["retrieval_ms"], 2)
+    }
+    if result.get("status", "success") == "success":
+        _analysis_cache().set(cache_key, result)
+    return result
+
+
+def analyze_documents(fir_text: str, witness_statements: List[str], mode: str = "combined") -> Dict[str, Any]:
     """
     Analyze FIR and witness statements to identify discrepancies.
     
     Args:
         fir_text: First Information Report text
         witness_statements: List of Witness statement texts
+        mode: 'combined' sends one prompt with every statement; 'pairwise'
+            analyzes each FIR/witness and witness/witness pair separately;
+            'fast' only runs the local fact checker and never calls the LLM
         
     Returns:
         Dictionary containing analysis results with discrepancies
     """
+    if mode == "fast":
+        return analyze_documents_fast(fir_text, witness_statements)
+    if mode == "pairwise":
+        return analyze_documents_pairwise(fir_text, witness_statements)
+
     try:
+        cache_key = analysis_cache_key(fir_text, witness_statements)
+        cached = _analysis_cache().get(cache_key)
+        if cached is not None:
+            return cached
+
         if not settings.gemini_api_key:
             return {
                 "status": "error",
@@ -53,43 +172,245 @@ def analyze_documents(fir_text: str, witness_statements: List[str]) -> Dict[str,
                 "discrepancies": []
             }
         
-        witness_text_formatted = "\n\n".join([f"WITNESS {i+1}:\n{stmt}" for i, stmt in enumerate(witness_statements)])
+        # Fetch relevant IPC sections while the local checks run
+        retrieval_future = submit_retrieval(fir_text) if settings.rag_enabled else None
+        
+        # Mechanical mismatches are found locally; the LLM only covers the narrative
+        fact_report = check_consistency(fir_text, witness_statements)
 
-        prompt = f"""
-        Act as a legal expert AI. Analyze the consistency between the following First Information Report (FIR) and multiple Witness Statements.
+        retrieval = collect_retrieval(retrieval_future)
+        prompt = _combined_prompt(fir_text, witness_statements, fact_report, retrieval)
         
-        FIR TEXT:
-        {fir_text}
+        result = _get_gemini_response_json(prompt)
+        if result:
+            return _finish_combined(cache_key, result, fact_report, retrieval)
+        else:
+            raise Exception("Failed to generate analysis")
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e),
+            "discrepancies": []
+        }
+
+
+def analyze_documents_stream(
+    fir_text: str,
+    witness_statements: List[str],
+    mode: str = "combined"
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Analyze like analyze_documents, yielding discrepancies as they are found.
+    In combined mode the local fact mismatches come first, then each
+    narrative discrepancy as soon as the streamed model output closes it;
+    other modes yield their discrepancies once their analysis is done.
+
+    Yields:
+        ('discrepancy', item) for each discrepancy, then ('result', analysis)
+        with the same content analyze_documents returns
+    """
+    if mode != "combined" or not settings.gemini_api_key:
+        result = analyze_documents(fir_text, witness_statements, mode)
+        for item in result.get("discrepancies", []):
+            yield "discrepancy", item
+        yield "result", result
+        return
+
+    cache_key = analysis_cache_key(fir_text, witness_statements)
+    cached = _analysis_cache().get(cache_key)
+    if cached is not None:
+        for item in cached.get("discrepancies", []):
+            yield "discrepancy", item
+        yield "result", cached
+        return
+
+    try:
+        retrieval_future = submit_retrieval(fir_text) if settings.rag_enabled else None
+        fact_report = check_consistency(fir_text, witness_statements)
+        for item in fact_report["discrepancies"]:
+            yield "discrepancy", item
+
+        retrieval = collect_retrieval(retrieval_future)
+        prompt = _combined_prompt(fir_text, witness_statements, fact_report, retrieval)
+        parser = StreamingArrayParser("discrepancies")
+        for chunk in get_llm_client().generate_stream(prompt):
+            for item in parser.feed(chunk):
+                yield "discrepancy", item
+
+        result = parser.document()
+        if not isinstance(result, dict):
+            raise Exception("Failed to parse streamed analysis")
+        yield "result", _finish_combined(cache_key, result, fact_report, retrieval)
+    except Exception as e:
+        yield "result", {
+            "status": "error",
+            "message": str(e),
+            "discrepancies": []
+        }
+
+
+def analyze_documents_fast(fir_text: str, witness_statements: List[str]) -> Dict[str, Any]:
+    """
+    Flag mechanical fact mismatches locally without calling the LLM.
+    
+    Args:
+        fir_text: First Information Report text
+        witness_statements: List of Witness statement texts
+        
+    Returns:
+        Dictionary with the same schema as analyze_documents, covering only
+        dates, times, vehicle numbers, amounts, counts of accused and places
+    """
+    report = check_consistency(fir_text, witness_statements)
+    mismatched = dict.fromkeys(d["fact_type"] for d in report["discrepancies"])
+    return {
+        "status": "success",
+        "mode": "fast",
+        "discrepancies": report["discrepancies"],
+        "similarity_score": report["similarity_score"],
+        "recommendations": [
+            f"Re-examine the statements on the {FACT_LABELS[fact_type].lower()}"
+            for fact_type in mismatched
+        ],
+        "confidence": 1.0,
+        "facts_compared": report["facts_compared"]
+    }
+
+
+def _analyze_pair(kind_a: str, text_a: str, kind_b: str, text_b: str) -> Dict[str, Any]:
+    """
+    Analyze one pair of statements, reusing a cached result when available.
+
+    The prompt refers to the documents generically so a cached pair result
+    stays valid whatever position the statements have in the case.
+    """
+    cache_key = make_cache_key([
+        PAIR_PROMPT_VERSION, settings.gemini_model,
+        kind_a, normalize_text(text_a), kind_b, normalize_text(text_b)
+    ])
+    cached = _pair_cache().get(cache_key)
+    if cached is not None:
+        cached["cached"] = True
+        return cached
+
+    known, _ = compare_facts(extract_facts(text_a), extract_facts(text_b), "Document A", "Document B")
+
+    prompt = f"""
+        Act as a legal expert AI. Compare the following two statements from the same case for contradictions.
+        
+        DOCUMENT A ({kind_a}):
+        {text_a}
         
-        WITNESS STATEMENTS:
-        {witness_text_formatted}
+        DOCUMENT B ({kind_b}):
+        {text_b}
+        
+        FACTUAL MISMATCHES ALREADY DETECTED:
+        {format_known_discrepancies(known)}
         
         Task:
-        1. Compare each witness statement against the FIR for contradictions.
-        2. Compare witness statements against EACH OTHER for contradictions.
-        3. Identify missing details or discrepancies.
+        1. Identify contradictions between Document A and Document B.
+        2. Identify details present in one document but missing from the other.
+        Do not repeat the factual mismatches listed above; focus on contradictions in the narrative.
         
         Output the result ONLY in the following JSON format:
         {{
-            "status": "success",
-            "discrepancies": [
-                {{
-                    "source": "Witness 1 vs FIR" or "Witness 1 vs Witness 2",
-                    "details": "Description of the discrepancy"
-                }}
-            ],
-            "similarity_score": <float between 0 and 1 indicating overall consistency>,
+            "discrepancies": ["Description of each discrepancy"],
+            "similarity_score": <float between 0 and 1 indicating consistency of the two documents>,
             "recommendations": ["list of actionable recommendations"],
             "confidence": <float between 0 and 1 representing confidence in this analysis>
         }}
         """
+
+    result = _get_gemini_response_json(prompt)
+    if not result:
+        raise Exception("Failed to generate pair analysis")
+    _pair_cache().set(cache_key, result)
+    result["cached"] = False
+    return result
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+def analyze_documents_pairwise(fir_text: str, witness_statements: List[str]) -> Dict[str, Any]:
+    """
+    Analyze FIR and witness statements as independent pair jobs.
+
+    Every FIR-vs-witness and witness-vs-witness pair is analyzed concurrently
+    and cached by its own hash, so adding a witness only costs the new pairs.
+    
+    Args:
+        fir_text: First Information Report text
+        witness_statements: List of Witness statement texts
         
-        result = _get_gemini_response_json(prompt)
-        if result:
-            return result
-        else:
+    Returns:
+        Dictionary with the same schema as analyze_documents
+    """
+    try:
+        if not settings.gemini_api_key:
+            return {
+                "status": "error",
+                "message": "Gemini API Key not configured",
+                "discrepancies": []
+            }
+
+        jobs: List[Tuple[str, Tuple[str, str, str, str]]] = []
+        for i, stmt in enumerate(witness_statements):
+            jobs.append((f"Witness {i+1} vs FIR", ("FIR", fir_text, "Witness statement", stmt)))
+        for i in range(len(witness_statements)):
+            for j in range(i + 1, len(witness_statements)):
+                jobs.append((
+                    f"Witness {i+1} vs Witness {j+1}",
+                    ("Witness statement", witness_statements[i], "Witness statement", witness_statements[j])
+                ))
+
+        executor = _get_pair_executor()
+        futures = [(source, executor.submit(_analyze_pair, *args)) for source, args in jobs]
+
+        discrepancies = check_consistency(fir_text, witness_statements)["discrepancies"]
+        recommendations = []
+        scores = []
+        confidences = []
+        failed_pairs = []
+        cached_pairs = 0
+        for source, future in futures:
+            try:
+                pair = future.result()
+            except Exception as e:
+                failed_pairs.append({"source": source, "message": str(e)})
+                continue
+
+            cached_pairs += 1 if pair.get("cached") else 0
+            for item in pair.get("discrepancies", []):
+                details = item.get("details", "") if isinstance(item, dict) else str(item)
+                discrepancies.append({"source": source, "details": details})
+            for recommendation in pair.get("recommendations", []):
+                if recommendation not in recommendations:
+                    recommendations.append(recommendation)
+            if isinstance(pair.get("similarity_score"), (int, float)):
+                scores.append(float(pair["similarity_score"]))
+            if isinstance(pair.get("confidence"), (int, float)):
+                confidences.append(float(pair["confidence"]))
+
+        if futures and len(failed_pairs) == len(futures):
             raise Exception("Failed to generate analysis")
 
+        return {
+            "status": "success",
+            "mode": "pairwise",
+            "discrepancies": discrepancies,
+            "similarity_score": _mean(scores),
+            "recommendations": recommendations,
+            "confidence": _mean(confidences),
+            "pairs": {
+                "total": len(futures),
+                "cached": cached_pairs,
+                "failed": failed_pairs
+            }
+        }
+
     except Exception as e:
         return {
             "status": "error",
@@ -147,17 +468,31 @@ def compare_texts(text1: str, text2: str) -> Dict[str, Any]:
         }
 
 
-def extract_entities(text: str) -> Dict[str, Any]:
+def _fact_texts(facts: Dict[str, List[Dict[str, Any]]], fact_type: str) -> List[str]:
+    return list(dict.fromkeys(f["text"] for f in facts.get(fact_type, [])))
+
+
+def extract_entities(text: str, fast_only: bool = False) -> Dict[str, Any]:
     """
     Extract named entities and key information from legal text.
     
     Args:
         text: Legal document text
+        fast_only: Return only locally extracted facts without calling the LLM
         
     Returns:
         Dictionary containing extracted entities
     """
     try:
+        facts = extract_facts(text)
+        if fast_only:
+            return {
+                "status": "success",
+                "dates": _fact_texts(facts, "dates"),
+                "locations": _fact_texts(facts, "places"),
+                "facts": facts
+            }
+
         if not settings.gemini_api_key:
             raise Exception("Gemini API Key missing")
             
@@ -180,6 +515,11 @@ def extract_entities(text: str) -> Dict[str, Any]:
 
         result = _get_gemini_response_json(prompt)
         if result:
+            for key, fact_type in (("dates", "dates"), ("locations", "places")):
+                merged = list(result.get(key, []))
+                merged.extend(t for t in _fact_texts(facts, fact_type) if t not in merged)
+                result[key] = merged
+            result["facts"] = facts
             return result
         else:
              return {
@@ -191,27 +531,3 @@ def extract_entities(text: str) -> Dict[str, Any]:
             "status": "error",
             "message": str(e)
         }
-
-def get_ipc_retriever():
-    """Connects to the existing ChromaDB and returns a retriever."""
-    try:
-        embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/text-embedding-004", 
-            google_api_key=settings.gemini_api_key
-        )
-        
-        # Connect to the SAME path used in the ingestion script
-        persistent_client = chromadb.PersistentClient(path="./chroma_db")
-        
-        db = Chroma(
-            client=persistent_client,
-            embedding_function=embeddings,
-            collection_name="ipc_data" # Must match the ingestion script
-        )
-        
-        # Return retriever configured to find the top 3 relevant sections
-        return db.as_retriever(search_kwargs={"k": 3})
-        
-    except Exception as e:
-        print(f"⚠️ Vector Store Error: {e}")
-        return None
@@ -0,0 +1,78 @@
+"""
+Content-addressed blob store for evidence reports.
+Full analysis reports stay on local disk, keyed by the SHA-256 digest that
+is anchored on chain; a blob is written once and never overwritten.
+"""
+
+from typing import Any, Optional
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from app.core.config import settings
+
+
+def canonical_json(value: Any) -> str:
+    """Serialize a report so equal content always yields the same digest."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+class BlobStore:
+    """Immutable files under root_dir/<aa>/<bb>/<sha256>"""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        digest = digest.lower()
+        digest = digest[2:] if digest.startswith("0x") else digest
+        if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+            raise ValueError("Blob digest must be a 32-byte hex SHA-256")
+        return os.path.join(self.root_dir, digest[:2], digest[2:4], digest)
+
+    def put(self, data: bytes) -> str:
+        """
+        Store bytes under their SHA-256 digest.
+
+        Returns:
+            Hex digest (0x-prefixed); storing existing content is a no-op
+        """
+        digest = "0x" + hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if os.path.exists(path):
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so readers never see partial blobs
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """Return the blob for a digest, or None if it is not stored."""
+        try:
+            with open(self._path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+_blob_store: Optional[BlobStore] = None
+_blob_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Return the shared blob store, creating it on first use."""
+    global _blob_store
+    if _blob_store is None:
+        with _blob_store_lock:
+            if _blob_store is None:
+                _blob_store = BlobStore(settings.evidence_blob_dir)
+    return _blob_store
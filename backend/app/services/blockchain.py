@@ -1,92 +1,546 @@
 """
-Blockchain Service for storing evidence on Polygon network.
+Blockchain Service for anchoring evidence digests on Polygon network.
 Handles smart contract interactions and transaction management.
+One service instance lives for the whole application: it keeps a pooled
+keep-alive RPC session, a cached contract object and a background health
+check, so requests never pay for connection setup or probes. Only fixed-size
+SHA-256 digests go on chain; full reports live in the local blob store.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache, partial
 import json
+import os
+import threading
+import time
+import uuid
+import requests
+from requests.adapters import HTTPAdapter
 from web3 import Web3
 from eth_account import Account
 from app.core.config import settings
+from app.services.blob_store import get_blob_store
+from app.services.evidence_index import EvidenceIndex
+from app.services.merkle import MerkleBatcher, leaf_hash, verify_proof
+from app.services.tx_queue import TransactionQueue, TxJob
+
+ABI_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "abi", "EvidenceVault.json")
+
+# Fields an evidence record shares with an earlier record of the same digest
+ANCHOR_FIELDS = ("root", "leaf", "leaf_index", "leaf_count", "proof", "tx_hash", "block_number", "timestamp")
+
+
+def _from_hex(value: str) -> bytes:
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+
+def _normalize_hex(value: str) -> str:
+    value = value.lower()
+    return value if value.startswith("0x") else "0x" + value
+
+
+@lru_cache(maxsize=None)
+def load_contract_abi() -> Optional[List[Dict[str, Any]]]:
+    """Read the EvidenceVault ABI once per process."""
+    try:
+        with open(ABI_PATH, "r") as f:
+            artifact = json.load(f)
+    except FileNotFoundError:
+        return None
+    # Hardhat artifacts wrap the ABI; plain ABI files are a bare list
+    return artifact["abi"] if isinstance(artifact, dict) else artifact
 
 
 class BlockchainService:
     """Service for interacting with Polygon blockchain"""
     
     def __init__(self):
-        """Initialize blockchain service with Web3 connection"""
+        """Initialize blockchain service with a pooled Web3 connection"""
         try:
-            self.w3 = Web3(Web3.HTTPProvider(settings.polygon_rpc_url))
-            self.is_connected = self.w3.is_connected()
+            self.session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=settings.rpc_pool_connections,
+                pool_maxsize=settings.rpc_pool_connections
+            )
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+            self.w3 = Web3(Web3.HTTPProvider(
+                settings.polygon_rpc_url,
+                request_kwargs={"timeout": settings.rpc_timeout_seconds},
+                session=self.session
+            ))
             self.contract_address = settings.contract_address
             self.private_key = settings.private_key
-            
-            # Load contract ABI
-            try:
-                with open("app/data/abi/EvidenceVault.json", "r") as f:
-                    self.abi = json.load(f)
-            except FileNotFoundError:
-                self.abi = None
-                
+            self.account = Account.from_key(self.private_key) if self.private_key else None
+            self.abi = load_contract_abi()
+            self.contract = None
+            if self.abi and self.contract_address:
+                self.contract = self.w3.eth.contract(
+                    address=Web3.to_checksum_address(self.contract_address),
+                    abi=self.abi
+                )
         except Exception as e:
             raise Exception(f"Failed to initialize blockchain service: {str(e)}")
+        
+        self.index = EvidenceIndex(settings.evidence_index_path)
+        self.tx_queue = TransactionQueue(self.w3, self.account, self._on_tx_settled) if self.account else None
+        # Transaction ID => ("root" | "digest", hex value, leaf count) awaiting confirmation
+        self._anchor_jobs: Dict[str, tuple] = {}
+        self.batcher = MerkleBatcher(self.anchor_root, settings.anchor_window_seconds, settings.anchor_max_leaves)
+        self._evidence: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Digest => batch future (merkle) or transaction ID (direct) of its live anchoring
+        self._anchoring: "OrderedDict[str, Any]" = OrderedDict()
+        self._evidence_lock = threading.Lock()
+        self.is_connected = False
+        self.last_health_check: Optional[float] = None
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+    
+    def check_health(self) -> bool:
+        """Probe the RPC node once and record the result."""
+        try:
+            self.is_connected = self.w3.is_connected()
+        except Exception:
+            self.is_connected = False
+        self.last_health_check = time.time()
+        return self.is_connected
+    
+    def _health_loop(self) -> None:
+        while True:
+            if self.is_connected:
+                try:
+                    self.sync_from_events()
+                except Exception as e:
+                    print(f"Evidence event sync failed: {e}")
+            if self._stop.wait(settings.chain_health_interval_seconds):
+                break
+            self.check_health()
+    
+    def start(self) -> None:
+        """Run the first health check and start the background checker."""
+        self.check_health()
+        if self._health_thread is None:
+            self._health_thread = threading.Thread(target=self._health_loop, name="chain-health", daemon=True)
+            self._health_thread.start()
+    
+    def close(self) -> None:
+        """Stop the health checker and sender and release pooled connections."""
+        self._stop.set()
+        if self.tx_queue is not None:
+            self.tx_queue.stop()
+        self.session.close()
+    
+    def health(self) -> Dict[str, Any]:
+        """Return the last known connection state."""
+        return {
+            "connected": self.is_connected,
+            "last_check": self.last_health_check,
+            "contract_loaded": self.contract is not None,
+            "anchoring": self.batcher.stats(),
+            "index": self.index.stats(),
+            "transactions": self.tx_queue.stats() if self.tx_queue is not None else {}
+        }
+    
+    def submit_transaction(self, function_call) -> TxJob:
+        """
+        Queue a contract call for background signing and sending.
+        
+        Args:
+            function_call: Bound contract function, e.g. contract.functions.anchorRoot(...)
+            
+        Returns:
+            The transaction job; poll tx_queue.get(job.id) for its status
+        """
+        if self.contract is None or self.tx_queue is None:
+            raise Exception("Contract address, ABI and private key must be configured")
+        return self.tx_queue.submit(function_call)
+    
+    def anchor_root(self, root: bytes, leaf_count: int) -> Dict[str, Any]:
+        """Queue anchoring of one Merkle root covering leaf_count evidence digests."""
+        job = self.submit_transaction(self.contract.functions.anchorRoot(root, leaf_count))
+        self._track_anchor(job, ("root", "0x" + root.hex(), leaf_count))
+        return {"tx_id": job.id}
+    
+    def register_digest(self, digest: bytes) -> TxJob:
+        """Queue registration of a single evidence digest."""
+        job = self.submit_transaction(self.contract.functions.registerDigest(digest))
+        self._track_anchor(job, ("digest", "0x" + digest.hex(), None))
+        return job
+    
+    def _track_anchor(self, job: TxJob, anchored: tuple) -> None:
+        self._anchor_jobs[job.id] = anchored
+        # A job can fail before broadcast, and settle, before it is tracked here
+        tx = self.tx_queue.get(job.id)
+        if tx is not None and tx["status"] == "failed":
+            self._anchor_jobs.pop(job.id, None)
+    
+    def _on_tx_settled(self, tx: Dict[str, Any]) -> None:
+        """Index a root or digest as soon as its transaction is confirmed."""
+        anchored = self._anchor_jobs.pop(tx["tx_id"], None)
+        if anchored is None or tx["status"] != "confirmed":
+            return
+        kind, value, leaf_count = anchored
+        block = self.w3.eth.get_block(tx["block_number"])
+        if kind == "root":
+            self.index.record_root(value, leaf_count, tx["tx_hash"], tx["block_number"], block.timestamp)
+        else:
+            self.index.record_digest(value, tx["tx_hash"], tx["block_number"], block.timestamp)
+    
+    def _remember_evidence(self, record: Dict[str, Any], anchoring: Any = None) -> None:
+        with self._evidence_lock:
+            self._evidence[record["evidence_id"]] = record
+            while len(self._evidence) > settings.evidence_records_max:
+                self._evidence.popitem(last=False)
+            if anchoring is not None:
+                self._anchoring[record["digest"]] = anchoring
+                while len(self._anchoring) > settings.evidence_records_max:
+                    self._anchoring.popitem(last=False)
+    
+    def _tx_failed(self, tx_id: Optional[str]) -> bool:
+        tx = self.tx_queue.get(tx_id) if tx_id is not None and self.tx_queue is not None else None
+        return tx is None or tx.get("status") == "failed"
+    
+    def _live_anchoring(self, digest_hex: str) -> Any:
+        """Return the batch future or transaction ID still anchoring a digest, unless it failed."""
+        with self._evidence_lock:
+            anchoring = self._anchoring.get(digest_hex)
+        if isinstance(anchoring, Future):
+            if not anchoring.done():
+                return anchoring
+            if anchoring.exception() is None and not self._tx_failed(anchoring.result().get("tx_id")):
+                return anchoring
+        elif anchoring is not None and not self._tx_failed(anchoring):
+            return anchoring
+        return None
+    
+    def _confirmed_anchoring(self, digest_hex: str) -> Optional[Dict[str, Any]]:
+        """Return a confirmed anchoring of a digest from the index or the digest registry."""
+        record = self.index.lookup([digest_hex]).get(digest_hex)
+        if record is not None and record.get("timestamp"):
+            return {key: record[key] for key in ANCHOR_FIELDS if key in record}
+        registered = self.index.registered([digest_hex]).get(digest_hex)
+        # Only a direct registration reverts on a known digest; merkle mode skips the RPC
+        if registered is None and self.contract is not None and settings.evidence_anchor_mode != "merkle":
+            registered_at = self.contract.functions.digestRegisteredAt(_from_hex(digest_hex)).call()
+            if registered_at:
+                registered = {"timestamp": registered_at}
+        if registered is not None:
+            return {key: registered[key] for key in ANCHOR_FIELDS if key in registered}
+        return None
+    
+    def _attach_batch(self, evidence_id: str, future) -> None:
+        """Record the Merkle receipt (or failure) once the evidence's batch closes."""
+        with self._evidence_lock:
+            record = self._evidence.get(evidence_id)
+            if record is None:
+                return
+            error = future.exception()
+            if error is not None:
+                record.update({"status": "failed", "error": str(error)})
+            else:
+                record.update(future.result())
+            record = dict(record)
+        self.index.record_evidence(record)
     
     def store_evidence(self, evidence_data: str) -> Dict[str, Any]:
         """
-        Store evidence on blockchain.
+        Store evidence on blockchain without waiting for the chain.
+        The full report goes to the local blob store under its SHA-256
+        digest. In 'merkle' anchor mode the digest joins the current batch
+        and only the batch root is written; in 'direct' mode the digest is
+        registered with one transaction of its own. Either way the
+        transaction is sent by the background queue.
         
         Args:
             evidence_data: JSON string containing evidence data
             
         Returns:
-            Dictionary containing transaction hash and confirmation details
+            Dictionary with the evidence ID to poll via get_evidence_status
         """
         try:
-            # TODO: Implement contract interaction
-            # Load contract ABI and interact with smart contract
             if not self.is_connected:
                 return {
                     "status": "error",
                     "message": "Web3 not connected to blockchain",
-                    "tx_hash": None
+                    "evidence_id": None
                 }
             
+            digest_hex = get_blob_store().put(evidence_data.encode("utf-8"))
+            digest = _from_hex(digest_hex)
+            record = {
+                "evidence_id": uuid.uuid4().hex,
+                "digest": digest_hex,
+                "status": "queued",
+                "created_at": time.time()
+            }
+            # Identical reports share a digest; anchoring it again would revert
+            # (the root or registration already exists), so reuse the first one
+            anchoring = self._live_anchoring(digest_hex)
+            confirmed = self._confirmed_anchoring(digest_hex) if anchoring is None else None
+            if confirmed is not None:
+                record.update(confirmed, status="confirmed")
+                self._remember_evidence(record)
+                self.index.record_evidence(record)
+            elif isinstance(anchoring, str):
+                record["tx_id"] = anchoring
+                self._remember_evidence(record)
+                self.index.record_evidence(record)
+            elif settings.evidence_anchor_mode == "merkle":
+                future = anchoring or self.batcher.add(digest)
+                self._remember_evidence(record, future)
+                self.index.record_evidence(record)
+                future.add_done_callback(partial(self._attach_batch, record["evidence_id"]))
+            else:
+                job = self.register_digest(digest)
+                record["tx_id"] = job.id
+                self._remember_evidence(record, job.id)
+                self.index.record_evidence(record)
+            
             return {
                 "status": "success",
-                "tx_hash": "0x" + "0" * 64,
-                "block_number": None,
-                "message": "Evidence stored on blockchain (placeholder)"
+                "message": "Evidence queued for blockchain storage",
+                "evidence_id": record["evidence_id"],
+                "evidence_status": record["status"],
+                "digest": record["digest"]
             }
         except Exception as e:
             return {
                 "status": "error",
                 "message": str(e),
-                "tx_hash": None
+                "evidence_id": None
             }
     
+    def get_evidence_status(self, evidence_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Report where an evidence item is on its way to the chain.
+        
+        Args:
+            evidence_id: ID returned by store_evidence
+            
+        Returns:
+            The evidence record with status queued, pending, mined,
+            confirmed or failed, its Merkle receipt and transaction details;
+            None if the ID is unknown
+        """
+        with self._evidence_lock:
+            record = self._evidence.get(evidence_id)
+            record = dict(record) if record is not None else None
+        if record is None:
+            # Evidence from before a restart is only in the index
+            record = self.index.get_by_id(evidence_id)
+            if record is None:
+                return None
+            confirmed = record.get("timestamp") or self.index.registered([record["digest"]])
+            record["status"] = "confirmed" if confirmed else "pending"
+        tx_id = record.pop("tx_id", None)
+        if tx_id is not None and (self.tx_queue is None or self.tx_queue.get(tx_id) is None):
+            tx_id = None
+        if tx_id is not None and record["status"] != "failed":
+            tx = self.tx_queue.get(tx_id) or {}
+            record["status"] = tx.get("status", record["status"])
+            record["tx_hash"] = tx.get("tx_hash")
+            record["block_number"] = tx.get("block_number")
+            record["confirmations"] = tx.get("confirmations", 0)
+            if tx.get("error"):
+                record["error"] = tx["error"]
+        return record
+    
+    def _index_event(self, event) -> None:
+        if event.event == "DigestRegistered":
+            self.index.record_digest(
+                "0x" + event.args.digest.hex(),
+                event.transactionHash.hex(),
+                event.blockNumber,
+                event.args.timestamp
+            )
+            return
+        self.index.record_root(
+            "0x" + event.args.root.hex(),
+            event.args.leafCount,
+            event.transactionHash.hex(),
+            event.blockNumber,
+            event.args.timestamp
+        )
+    
+    def sync_from_events(self) -> int:
+        """
+        Replay confirmed RootAnchored and DigestRegistered events into the
+        local index, resuming from the last synced block. A fresh index
+        starts at contract_deploy_block, or at the current head when that
+        is not set. At most event_sync_max_chunks ranges are fetched per
+        call, so a long backlog is worked off over several health ticks.
+        
+        Returns:
+            Number of events indexed
+        """
+        if self.contract is None:
+            return 0
+        latest = self.w3.eth.block_number - settings.tx_confirmations + 1
+        synced = self.index.get_meta("synced_block")
+        if synced is not None:
+            start = int(synced) + 1
+        elif settings.contract_deploy_block > 0:
+            start = settings.contract_deploy_block
+        else:
+            # Without a deploy block, replaying from genesis would take hours; only follow new blocks
+            self.index.set_meta("synced_block", str(latest))
+            return 0
+        end = min(latest, start + settings.event_sync_chunk_blocks * settings.event_sync_max_chunks - 1)
+        indexed = 0
+        for from_block in range(start, end + 1, settings.event_sync_chunk_blocks):
+            if self._stop.is_set():
+                break
+            to_block = min(from_block + settings.event_sync_chunk_blocks - 1, end)
+            for event_type in (self.contract.events.RootAnchored, self.contract.events.DigestRegistered):
+                for event in event_type.get_logs(fromBlock=from_block, toBlock=to_block):
+                    self._index_event(event)
+                    indexed += 1
+            self.index.set_meta("synced_block", str(to_block))
+        return indexed
+    
+    def _rpc_batch(self, fn_name: str, args_list: List[List[Any]]) -> List[Any]:
+        """
+        Run one read-only contract function for many arguments as JSON-RPC
+        batch requests.
+        
+        Args:
+            fn_name: Contract view function, e.g. 'rootAnchoredAt'
+            args_list: Arguments for each call
+            
+        Returns:
+            Decoded first return value per call, in order (None where it failed)
+        """
+        abi = next(entry for entry in self.abi if entry.get("name") == fn_name and entry["type"] == "function")
+        output_types = [output["type"] for output in abi["outputs"]]
+        results: List[Any] = [None] * len(args_list)
+        for start in range(0, len(args_list), settings.rpc_batch_size):
+            chunk = args_list[start:start + settings.rpc_batch_size]
+            payload = [
+                {
+                    "jsonrpc": "2.0",
+                    "id": start + offset,
+                    "method": "eth_call",
+                    "params": [
+                        {"to": self.contract.address, "data": self.contract.encodeABI(fn_name=fn_name, args=args)},
+                        "latest"
+                    ]
+                }
+                for offset, args in enumerate(chunk)
+            ]
+            response = self.session.post(settings.polygon_rpc_url, json=payload, timeout=settings.rpc_timeout_seconds)
+            response.raise_for_status()
+            for reply in response.json():
+                if "result" in reply:
+                    results[reply["id"]] = self.w3.codec.decode(output_types, _from_hex(reply["result"]))[0]
+        return results
+    
+    def verify_many(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Verify many evidence digests at once.
+        Digests and roots known to the local index are answered without RPC;
+        the remaining roots and digests are checked in JSON-RPC batches and
+        indexed. Digests without a Merkle root are checked against the
+        contract's digest registry.
+        
+        Args:
+            items: Dictionaries with a hex 'digest' and, for batch-anchored
+                evidence not in the index, its 'root' and 'proof'
+            
+        Returns:
+            One result per item, in order
+        """
+        digests = [_normalize_hex(item["digest"]) for item in items]
+        indexed = self.index.lookup(digests)
+        results = []
+        for digest, item in zip(digests, items):
+            known = indexed.get(digest, {})
+            root = _normalize_hex(item["root"]) if item.get("root") else known.get("root")
+            proof = item.get("proof") if item.get("proof") is not None else known.get("proof", [])
+            if root is None:
+                results.append({"digest": digest})
+                continue
+            results.append({
+                "digest": digest,
+                "root": root,
+                "proof_valid": verify_proof(leaf_hash(_from_hex(digest)), [_from_hex(node) for node in proof], _from_hex(root))
+            })
+        
+        wanted = sorted({result["root"] for result in results if "root" in result})
+        anchored = {root: record.get("timestamp") for root, record in self.index.roots(wanted).items()}
+        misses = [root for root in wanted if root not in anchored]
+        if misses:
+            timestamps = self._rpc_batch("rootAnchoredAt", [[_from_hex(root)] for root in misses])
+            for root, timestamp in zip(misses, timestamps):
+                if timestamp:
+                    anchored[root] = timestamp
+                    self.index.record_root(root, timestamp=timestamp)
+        
+        direct = sorted({result["digest"] for result in results if "root" not in result})
+        registered = {digest: record.get("timestamp") for digest, record in self.index.registered(direct).items()}
+        digest_misses = [digest for digest in direct if digest not in registered]
+        if digest_misses:
+            timestamps = self._rpc_batch("digestRegisteredAt", [[_from_hex(digest)] for digest in digest_misses])
+            for digest, timestamp in zip(digest_misses, timestamps):
+                if timestamp:
+                    registered[digest] = timestamp
+                    self.index.record_digest(digest, timestamp=timestamp)
+        
+        for result in results:
+            if "root" not in result:
+                timestamp = registered.get(result["digest"])
+                result.update({
+                    "registered": bool(timestamp),
+                    "timestamp": timestamp,
+                    "verified": bool(timestamp),
+                    "source": "chain" if result["digest"] in digest_misses else "index"
+                })
+                continue
+            timestamp = anchored.get(result["root"])
+            result.update({
+                "root_anchored": bool(timestamp),
+                "timestamp": timestamp,
+                "verified": result["proof_valid"] and bool(timestamp),
+                "source": "chain" if result["root"] in misses else "index"
+            })
+        return results
+    
     def retrieve_evidence(self, tx_hash: str) -> Dict[str, Any]:
         """
         Retrieve stored evidence from blockchain.
+        Answered from the local index; transactions it has not seen are
+        read once from their receipt and indexed.
         
         Args:
             tx_hash: Transaction hash of stored evidence
             
         Returns:
-            Dictionary containing retrieved evidence
+            Dictionary containing the roots anchored by the transaction and
+            the indexed evidence under them or registered by it
         """
         try:
-            if not self.is_connected:
-                return {
-                    "status": "error",
-                    "message": "Web3 not connected to blockchain"
-                }
+            tx_hash = _normalize_hex(tx_hash)
+            roots = self.index.get_roots_by_tx(tx_hash)
+            if not roots:
+                if not self.is_connected:
+                    return {
+                        "status": "error",
+                        "message": "Web3 not connected to blockchain"
+                    }
+                receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+                for event_type in (self.contract.events.RootAnchored, self.contract.events.DigestRegistered):
+                    for event in event_type().process_receipt(receipt):
+                        self._index_event(event)
+                roots = self.index.get_roots_by_tx(tx_hash)
             
-            # TODO: Implement contract read operation
+            anchored = roots + self.index.get_digests_by_tx(tx_hash)
             return {
                 "status": "success",
-                "evidence": {},
-                "verified": True,
-                "timestamp": None
+                "roots": roots,
+                "evidence": self.index.get_by_tx(tx_hash),
+                "verified": bool(anchored),
+                "timestamp": anchored[0].get("timestamp") if anchored else None
             }
         except Exception as e:
             return {
@@ -94,12 +548,24 @@ class BlockchainService:
                 "message": str(e)
             }
     
-    def verify_evidence_integrity(self, evidence_hash: str) -> Dict[str, Any]:
+    def verify_evidence_integrity(
+        self,
+        evidence_hash: str,
+        proof: Optional[List[str]] = None,
+        root: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Verify the integrity of stored evidence.
+        The Merkle proof is checked locally and the root must be anchored
+        in the contract.
         
         Args:
-            evidence_hash: Hash of the evidence to verify
+            evidence_hash: Hex SHA-256 digest of the evidence
+            proof: Hex sibling hashes returned when the evidence was anchored
+                (looked up in the index if omitted)
+            root: Hex Merkle root the evidence was anchored under (looked
+                up in the index if omitted; without one the digest registry
+                is checked)
             
         Returns:
             Dictionary containing verification results
@@ -110,13 +576,8 @@ class BlockchainService:
                     "status": "error",
                     "message": "Web3 not connected to blockchain"
                 }
-            
-            # TODO: Implement evidence verification
-            return {
-                "status": "success",
-                "verified": True,
-                "timestamp": None
-            }
+            result = self.verify_many([{"digest": evidence_hash, "proof": proof, "root": root}])[0]
+            return {"status": "success", **result}
         except Exception as e:
             return {
                 "status": "error",
@@ -124,25 +585,107 @@ class BlockchainService:
             }
 
 
+_service: Optional[BlockchainService] = None
+_service_lock = threading.Lock()
+
+
+def get_blockchain_service() -> BlockchainService:
+    """Return the application-wide blockchain service, creating it on first use."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                service = BlockchainService()
+                service.start()
+                _service = service
+    return _service
+
+
+def shutdown_blockchain_service() -> None:
+    """Stop the shared service; called from the application lifespan."""
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.close()
+            _service = None
+
+
+def chain_health() -> Dict[str, Any]:
+    """Return the shared service's health without creating or probing it."""
+    service = _service
+    if service is None:
+        return {"connected": False, "message": "Blockchain service not started"}
+    return service.health()
+
+
 def store_evidence(evidence_data: str) -> str:
     """
-    Store evidence on blockchain.
+    Queue evidence for storage on blockchain.
     
     Args:
-        evidence_data: JSON string containing evidence data
+        evidence_data: Canonical JSON string of the report (see
+            blob_store.canonical_json); only its digest goes on chain
         
     Returns:
-        Transaction hash
+        Evidence ID to poll with get_evidence_status
     """
     try:
-        service = BlockchainService()
-        result = service.store_evidence(evidence_data)
-        return result.get("tx_hash", "")
+        result = get_blockchain_service().store_evidence(evidence_data)
+        return result.get("evidence_id") or ""
     except Exception as e:
         # Return empty string on error for backward compatibility
         return ""
 
 
+def get_evidence_status(evidence_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up the chain status of queued evidence.
+    
+    Args:
+        evidence_id: ID returned by store_evidence
+        
+    Returns:
+        Evidence record including status and, once its batch closes, the
+        root, leaf_index and proof; None if the ID is unknown
+    """
+    return get_blockchain_service().get_evidence_status(evidence_id)
+
+
+def verify_evidence(
+    evidence_hash: str,
+    proof: Optional[List[str]] = None,
+    root: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Verify evidence against its anchored Merkle root or the digest registry.
+    
+    Args:
+        evidence_hash: Hex SHA-256 digest of the evidence
+        proof: Hex sibling hashes from the anchoring receipt (from the index if omitted)
+        root: Hex Merkle root (from the index if omitted)
+        
+    Returns:
+        Verification results
+    """
+    try:
+        return get_blockchain_service().verify_evidence_integrity(evidence_hash, proof, root)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+def verify_evidence_bulk(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Verify many evidence digests, answering from the local index first.
+    
+    Args:
+        items: Dictionaries with 'digest' and optionally 'root' and 'proof'
+        
+    Returns:
+        One verification result per item
+    """
+    return get_blockchain_service().verify_many(items)
+
+
 def retrieve_evidence(tx_hash: str) -> Dict[str, Any]:
     """
     Retrieve stored evidence from blockchain.
@@ -154,7 +697,6 @@ def retrieve_evidence(tx_hash: str) -> Dict[str, Any]:
         Evidence data
     """
     try:
-        service = BlockchainService()
-        return service.retrieve_evidence(tx_hash)
+        return get_blockchain_service().retrieve_evidence(tx_hash)
     except Exception as e:
         return {"status": "error", "message": str(e)}
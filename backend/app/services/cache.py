@@ -0,0 +1,272 @@
+"""
+Content-addressed result cache.
+An in-memory LRU sits in front of an on-disk SQLite store; entries are
+keyed by SHA-256 of normalized inputs and expire by TTL and total size.
+"""
+
+from typing import Callable, Dict, Any, Optional, Iterable
+from collections import OrderedDict
+from concurrent.futures import Future
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from app.core.config import settings
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse runs of whitespace so formatting-only edits share a key."""
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def make_cache_key(parts: Iterable[str]) -> str:
+    """
+    Build a SHA-256 key from ordered parts.
+
+    Args:
+        parts: Strings that identify the cached computation, in order
+
+    Returns:
+        Hex digest; parts are length-prefixed so boundaries are unambiguous
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        encoded = part.encode("utf-8")
+        digest.update(str(len(encoded)).encode("ascii") + b":")
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class TwoTierCache:
+    """Thread-safe LRU + SQLite cache for JSON-serializable values"""
+
+    def __init__(
+        self,
+        namespace: str,
+        memory_entries: int,
+        ttl_seconds: int,
+        max_disk_bytes: int,
+        cache_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            namespace: Name of the cache; also the SQLite file name
+            memory_entries: Maximum number of entries kept in memory
+            ttl_seconds: Entry lifetime; 0 keeps entries until evicted by size
+            max_disk_bytes: Total size budget for the on-disk tier
+            cache_dir: Directory for the SQLite file (defaults to settings.cache_dir)
+        """
+        self.namespace = namespace
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+        directory = cache_dir or settings.cache_dir
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(
+            os.path.join(directory, f"{namespace}.sqlite3"),
+            check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._db.commit()
+        self._disk_bytes = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    def _expired(self, created: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created > self.ttl_seconds
+
+    def _remember(self, key: str, payload: str, created: float) -> None:
+        self._memory[key] = (payload, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _delete_disk(self, key: str) -> None:
+        row = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        if row:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._disk_bytes -= row[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key from make_cache_key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return json.loads(entry[0])
+                del self._memory[key]
+
+            row = self._db.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            payload, created = row
+            if self._expired(created, now):
+                self._delete_disk(key)
+                self._db.commit()
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            payload = payload.decode("utf-8") if isinstance(payload, bytes) else payload
+            self._remember(key, payload, created)
+            self._stats["disk_hits"] += 1
+            return json.loads(payload)
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a JSON-serializable value in both tiers.
+
+        Args:
+            key: Cache key from make_cache_key
+            value: Value to cache
+        """
+        payload = json.dumps(value)
+        encoded = payload.encode("utf-8")
+        now = time.time()
+        with self._lock:
+            self._remember(key, payload, now)
+            self._delete_disk(key)
+            self._db.execute(
+                "INSERT INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded), now, now)
+            )
+            self._disk_bytes += len(encoded)
+            self._stats["sets"] += 1
+            self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds:
+            cutoff = now - self.ttl_seconds
+            removed = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries WHERE created < ?", (cutoff,)
+            ).fetchone()
+            if removed[1]:
+                self._db.execute("DELETE FROM entries WHERE created < ?", (cutoff,))
+                self._disk_bytes -= removed[0]
+                self._stats["expired"] += removed[1]
+
+        while self._disk_bytes > self.max_disk_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM entries ORDER BY accessed LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._memory.pop(key, None)
+                self._disk_bytes -= size
+                self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["memory_entries"] = len(self._memory)
+            snapshot["disk_bytes"] = self._disk_bytes
+        lookups = snapshot["memory_hits"] + snapshot["disk_hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = (snapshot["memory_hits"] + snapshot["disk_hits"]) / lookups if lookups else 0.0
+        return snapshot
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self.shared = 0
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """
+        Run func for key, or wait for the call already in flight for it.
+
+        Args:
+            key: Identity of the computation
+            func: Zero-argument callable producing the result
+
+        Returns:
+            The result of the single in-flight call
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+_caches: Dict[str, TwoTierCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str, memory_entries: int, ttl_seconds: int, max_disk_bytes: int) -> TwoTierCache:
+    """Return the shared cache for a namespace, creating it on first use."""
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = TwoTierCache(namespace, memory_entries, ttl_seconds, max_disk_bytes)
+            _caches[namespace] = cache
+        return cache
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Return statistics for every cache created in this process."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.namespace: cache.stats() for cache in caches}
@@ -0,0 +1,316 @@
+"""
+Diff engine for comparing legal documents.
+Implements Myers' O(ND) difference algorithm in linear space at line, word
+or character granularity, with detection of blocks that moved.
+"""
+
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import re
+
+GRANULARITIES = ("line", "word", "char")
+
+_WORD_TOKENS = re.compile(r"\s+|\w+|[^\w\s]")
+
+# Smallest block (in non-whitespace tokens) reported as a move
+_MIN_MOVE_TOKENS = {"line": 1, "word": 3, "char": 8}
+
+Opcode = Tuple[str, int, int, int, int]
+
+
+def tokenize(text: str, granularity: str) -> List[str]:
+    """
+    Split text into diff tokens; joining the tokens restores the text.
+
+    Args:
+        text: Text to split
+        granularity: 'line', 'word' or 'char'
+
+    Returns:
+        List of tokens
+    """
+    if granularity == "line":
+        return text.splitlines(keepends=True)
+    if granularity == "word":
+        return _WORD_TOKENS.findall(text)
+    if granularity == "char":
+        return list(text)
+    raise ValueError(f"Unsupported granularity: {granularity}")
+
+
+def _intern(a: List[str], b: List[str], granularity: str) -> Tuple[List[int], List[int]]:
+    """Map tokens to small ints so comparisons are cheap."""
+    ids: Dict[str, int] = {}
+    if granularity == "line":
+        # A missing trailing newline on the last line is not a change
+        a = [token.rstrip("\r\n") for token in a]
+        b = [token.rstrip("\r\n") for token in b]
+    a_ids = [ids.setdefault(token, len(ids)) for token in a]
+    b_ids = [ids.setdefault(token, len(ids)) for token in b]
+    return a_ids, b_ids
+
+
+def _middle_snake(a: Sequence[int], b: Sequence[int], alo: int, ahi: int, blo: int, bhi: int) -> Optional[Tuple[int, int]]:
+    """
+    Find the point where the forward and reverse searches overlap.
+
+    Returns:
+        (x, y) offsets relative to (alo, blo) splitting the problem in two,
+        or None when the ranges have nothing in common
+    """
+    n = ahi - alo
+    m = bhi - blo
+    max_d = (n + m + 1) // 2
+    offset = max_d
+    length = 2 * max_d + 2
+    v1 = [-1] * length
+    v2 = [-1] * length
+    v1[offset + 1] = 0
+    v2[offset + 1] = 0
+    delta = n - m
+    front = delta % 2 != 0
+    k1start = k1end = k2start = k2end = 0
+
+    for d in range(max_d):
+        for k1 in range(-d + k1start, d + 1 - k1end, 2):
+            k1_offset = offset + k1
+            if k1 == -d or (k1 != d and v1[k1_offset - 1] < v1[k1_offset + 1]):
+                x1 = v1[k1_offset + 1]
+            else:
+                x1 = v1[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[alo + x1] == b[blo + y1]:
+                x1 += 1
+                y1 += 1
+            v1[k1_offset] = x1
+            if x1 > n:
+                k1end += 2
+            elif y1 > m:
+                k1start += 2
+            elif front:
+                k2_offset = offset + delta - k1
+                if 0 <= k2_offset < length and v2[k2_offset] != -1:
+                    if x1 >= n - v2[k2_offset]:
+                        return x1, y1
+
+        for k2 in range(-d + k2start, d + 1 - k2end, 2):
+            k2_offset = offset + k2
+            if k2 == -d or (k2 != d and v2[k2_offset - 1] < v2[k2_offset + 1]):
+                x2 = v2[k2_offset + 1]
+            else:
+                x2 = v2[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[ahi - x2 - 1] == b[bhi - y2 - 1]:
+                x2 += 1
+                y2 += 1
+            v2[k2_offset] = x2
+            if x2 > n:
+                k2end += 2
+            elif y2 > m:
+                k2start += 2
+            elif not front:
+                k1_offset = offset + delta - k2
+                if 0 <= k1_offset < length and v1[k1_offset] != -1:
+                    x1 = v1[k1_offset]
+                    y1 = offset + x1 - k1_offset
+                    if x1 >= n - x2:
+                        return x1, y1
+    return None
+
+
+def _emit(opcodes: List[Opcode], tag: str, alo: int, ahi: int, blo: int, bhi: int) -> None:
+    if alo == ahi and blo == bhi:
+        return
+    if opcodes and opcodes[-1][0] == tag:
+        last = opcodes[-1]
+        opcodes[-1] = (tag, last[1], ahi, last[3], bhi)
+    else:
+        opcodes.append((tag, alo, ahi, blo, bhi))
+
+
+def _edit_script(a: Sequence[int], b: Sequence[int]) -> List[Opcode]:
+    """Run Myers' algorithm and return 'equal', 'delete' and 'insert' runs."""
+    raw: List[Opcode] = []
+    # Explicit stack instead of recursion so very different inputs cannot
+    # exhaust the interpreter's recursion limit
+    stack: List[Tuple] = [("diff", 0, len(a), 0, len(b))]
+    while stack:
+        task = stack.pop()
+        if task[0] != "diff":
+            _emit(raw, *task)
+            continue
+
+        _, alo, ahi, blo, bhi = task
+        start_a, start_b = alo, blo
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        _emit(raw, "equal", start_a, alo, start_b, blo)
+
+        end_a, end_b = ahi, bhi
+        while ahi > alo and bhi > blo and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+        suffix = ("equal", ahi, end_a, bhi, end_b)
+
+        if alo == ahi or blo == bhi:
+            _emit(raw, "delete", alo, ahi, blo, blo)
+            _emit(raw, "insert", ahi, ahi, blo, bhi)
+            _emit(raw, *suffix)
+            continue
+
+        split = _middle_snake(a, b, alo, ahi, blo, bhi)
+        stack.append(suffix)
+        if split is None:
+            stack.append(("insert", ahi, ahi, blo, bhi))
+            stack.append(("delete", alo, ahi, blo, blo))
+        else:
+            x, y = split
+            stack.append(("diff", alo + x, ahi, blo + y, bhi))
+            stack.append(("diff", alo, alo + x, blo, blo + y))
+    return raw
+
+
+def myers_opcodes(a: Sequence[int], b: Sequence[int]) -> List[Opcode]:
+    """
+    Compute a minimal edit script between two sequences.
+
+    Tokens that occur in only one sequence can never match, so they are
+    dropped before running Myers' algorithm and the matches are mapped back.
+    This keeps heavily rewritten documents from hitting the O(ND) worst case.
+
+    Args:
+        a: Original sequence
+        b: New sequence
+
+    Returns:
+        List of (tag, a_start, a_end, b_start, b_end) with tags 'equal',
+        'delete', 'insert' and 'replace', in document order
+    """
+    common = set(a).intersection(b)
+    a_index = [i for i, token in enumerate(a) if token in common]
+    b_index = [j for j, token in enumerate(b) if token in common]
+    filtered = _edit_script([a[i] for i in a_index], [b[j] for j in b_index])
+
+    opcodes: List[Opcode] = []
+    ai = bj = 0
+    for tag, alo, ahi, blo, bhi in filtered:
+        if tag != "equal":
+            continue
+        for offset in range(ahi - alo):
+            i, j = a_index[alo + offset], b_index[blo + offset]
+            if i > ai and j > bj:
+                opcodes.append(("replace", ai, i, bj, j))
+            elif i > ai:
+                opcodes.append(("delete", ai, i, bj, bj))
+            elif j > bj:
+                opcodes.append(("insert", ai, ai, bj, j))
+            _emit(opcodes, "equal", i, i + 1, j, j + 1)
+            ai, bj = i + 1, j + 1
+
+    if ai < len(a) and bj < len(b):
+        opcodes.append(("replace", ai, len(a), bj, len(b)))
+    elif ai < len(a):
+        opcodes.append(("delete", ai, len(a), bj, bj))
+    elif bj < len(b):
+        opcodes.append(("insert", ai, ai, bj, len(b)))
+    return opcodes
+
+
+def _block_key(tokens: List[str]) -> Tuple[str, ...]:
+    return tuple(token.strip() for token in tokens if token.strip())
+
+
+def _detect_moves(opcodes: List[Opcode], a: List[str], b: List[str], granularity: str) -> Dict[int, int]:
+    """
+    Pair removed blocks with identical inserted blocks elsewhere.
+
+    Returns:
+        Mapping of opcode index of the removed block to the index of the
+        inserted block it moved to
+    """
+    min_tokens = _MIN_MOVE_TOKENS[granularity]
+    inserted: Dict[Tuple[str, ...], List[int]] = {}
+    for index, (tag, _, _, blo, bhi) in enumerate(opcodes):
+        if tag in ("insert", "replace"):
+            key = _block_key(b[blo:bhi])
+            if len(key) >= min_tokens:
+                inserted.setdefault(key, []).append(index)
+
+    moves = {}
+    for index, (tag, alo, ahi, _, _) in enumerate(opcodes):
+        if tag in ("delete", "replace"):
+            key = _block_key(a[alo:ahi])
+            candidates = inserted.get(key)
+            if len(key) >= min_tokens and candidates:
+                target = candidates.pop(0)
+                if target != index:
+                    moves[index] = target
+    return moves
+
+
+def _line_starts(tokens: List[str]) -> List[int]:
+    """1-based line number on which each token starts (plus one past the end)."""
+    lines = []
+    line = 1
+    for token in tokens:
+        lines.append(line)
+        line += token.count("\n")
+    lines.append(line)
+    return lines
+
+
+def diff_texts(text1: str, text2: str, granularity: str = "line") -> Dict[str, Any]:
+    """
+    Diff two texts and describe every changed hunk.
+
+    Args:
+        text1: Original text
+        text2: New text
+        granularity: 'line', 'word' or 'char'
+
+    Returns:
+        Dictionary with the similarity score derived from the edit script,
+        token counts and the list of differences
+    """
+    a = tokenize(text1, granularity)
+    b = tokenize(text2, granularity)
+    a_ids, b_ids = _intern(a, b, granularity)
+    opcodes = myers_opcodes(a_ids, b_ids)
+    moves = _detect_moves(opcodes, a, b, granularity)
+    moved_targets = {target: source for source, target in moves.items()}
+    a_lines = _line_starts(a)
+    b_lines = _line_starts(b)
+
+    equal = 0
+    moved = 0
+    differences = []
+    for index, (tag, alo, ahi, blo, bhi) in enumerate(opcodes):
+        if tag == "equal":
+            equal += ahi - alo
+            continue
+
+        difference = {
+            "op": tag,
+            "line": a_lines[alo],
+            "line2": b_lines[blo],
+            "text1": "".join(a[alo:ahi]),
+            "text2": "".join(b[blo:bhi]),
+        }
+        if index in moves:
+            moved += ahi - alo
+            difference["moved_to_line"] = b_lines[opcodes[moves[index]][3]]
+        if index in moved_targets:
+            moved += bhi - blo
+            difference["moved_from_line"] = a_lines[opcodes[moved_targets[index]][1]]
+        if index in moves or index in moved_targets:
+            difference["op"] = "move" if tag != "replace" else "replace"
+        differences.append(difference)
+
+    total = len(a) + len(b)
+    return {
+        "granularity": granularity,
+        "similarity_score": (2 * equal + moved) / total if total else 1.0,
+        "tokens1": len(a),
+        "tokens2": len(b),
+        "differences": differences
+    }
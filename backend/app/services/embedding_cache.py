@@ -0,0 +1,160 @@
+"""
+Persistent embedding cache.
+Vectors are keyed by (model, SHA-256 of the text) and stored as raw
+float32 blobs in SQLite, with a small in-memory LRU for hot query texts.
+Ingestion and query-time embedding share it, so any text embedded once
+with a model is never sent to the API again.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import os
+import sqlite3
+import threading
+import numpy as np
+from app.core.config import settings
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """Thread-safe (model, text hash) -> vector store"""
+
+    def __init__(self, path: str, memory_entries: int = 1024):
+        """
+        Args:
+            path: SQLite file; its directory is created if missing
+            memory_entries: Vectors kept in the in-memory LRU
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[Tuple[str, bytes], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0}
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, digest BLOB NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, digest)) WITHOUT ROWID"
+        )
+        self._db.commit()
+
+    def _remember(self, key: Tuple[str, bytes], vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[int, np.ndarray]:
+        """
+        Look up cached vectors.
+
+        Returns:
+            Position in texts -> vector, for the texts that are cached
+        """
+        found: Dict[int, np.ndarray] = {}
+        pending: Dict[bytes, List[int]] = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                digest = text_digest(text)
+                vector = self._memory.get((model, digest))
+                if vector is not None:
+                    self._memory.move_to_end((model, digest))
+                    found[i] = vector
+                    self._stats["memory_hits"] += 1
+                else:
+                    pending.setdefault(digest, []).append(i)
+            digests = list(pending)
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(digests), 500):
+                chunk = digests[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT digest, vector FROM embeddings WHERE model = ? AND digest IN ({', '.join('?' * len(chunk))})",
+                    [model, *chunk]
+                ).fetchall()
+                for digest, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    self._remember((model, digest), vector)
+                    for i in pending.pop(digest):
+                        found[i] = vector
+                        self._stats["disk_hits"] += 1
+            self._stats["misses"] += sum(len(positions) for positions in pending.values())
+        return found
+
+    def put_many(self, model: str, texts: List[str], vectors: np.ndarray) -> None:
+        """Store one vector per text; existing entries are left as they are."""
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                vector = np.asarray(vector, dtype=np.float32)
+                digest = text_digest(text)
+                self._remember((model, digest), vector)
+                rows.append((model, digest, vector.tobytes()))
+            self._db.executemany("INSERT OR IGNORE INTO embeddings (model, digest, vector) VALUES (?, ?, ?)", rows)
+            self._db.commit()
+            self._stats["sets"] += len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["memory_entries"] = len(self._memory)
+            snapshot["models"] = {
+                model: count for model, count in self._db.execute(
+                    "SELECT model, COUNT(*) FROM embeddings GROUP BY model"
+                ).fetchall()
+            }
+        return snapshot
+
+
+class CachedEmbedder:
+    """Wraps an embedder so only texts missing from the cache are embedded"""
+
+    def __init__(self, embedder, cache: EmbeddingCache):
+        self.embedder = embedder
+        self.cache = cache
+        self.model_name = embedder.model_name
+
+    def _embed(self, texts: List[str], task: str, embed) -> np.ndarray:
+        # Document and query embeddings of one model differ, so the task is part of the key
+        model = f"{self.model_name}:{task}"
+        found = self.cache.get_many(model, texts)
+        missing = [i for i in range(len(texts)) if i not in found]
+        if missing:
+            fresh = embed([texts[i] for i in missing])
+            self.cache.put_many(model, [texts[i] for i in missing], fresh)
+            found.update(zip(missing, np.asarray(fresh, dtype=np.float32)))
+        return np.stack([found[i] for i in range(len(texts))]) if texts else np.zeros((0, 0), dtype=np.float32)
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        return self._embed(texts, "document", self.embedder.embed_documents)
+
+    def embed_queries(self, texts: List[str]) -> np.ndarray:
+        return self._embed(texts, "query", self.embedder.embed_queries)
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the shared embedding cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(
+                    os.path.join(settings.cache_dir, "embeddings.sqlite3"),
+                    settings.embedding_cache_memory_entries
+                )
+    return _cache
+
+
+def embedding_cache_stats() -> Optional[Dict[str, Any]]:
+    """Return cache statistics, or None if nothing has used the cache yet."""
+    return _cache.stats() if _cache is not None else None
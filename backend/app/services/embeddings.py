@@ -0,0 +1,117 @@
+"""
+Text embedders for the IPC vector store.
+The hashing embedder runs locally with no model or API key: tokens and
+bigrams are hashed into a fixed number of signed buckets with sublinear
+term frequency. The Gemini embedder calls the embedding API through the
+shared, rate-limited client behind the persistent embedding cache. Both
+return L2-normalized float32 rows. Collections are named per model so
+vectors from different models never share one.
+"""
+
+from typing import List
+import re
+import zlib
+import numpy as np
+from app.core.config import settings
+from app.services.embedding_cache import CachedEmbedder, get_embedding_cache
+from app.services.ipc_index import tokenize
+
+HASHING_PREFIX = "hashing-"
+
+
+def collection_name(base: str, model_name: str) -> str:
+    """Name of a collection for one embedding model, e.g. ipc_data__text-embedding-004."""
+    return f"{base}__{re.sub(r'[^A-Za-z0-9_-]+', '-', model_name.split('/')[-1])}"
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length so a dot product is cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class HashingEmbedder:
+    """Feature-hashing bag of words and bigrams; deterministic across processes"""
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.model_name = f"{HASHING_PREFIX}{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        tokens = tokenize(text)
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = {}
+            for feature in self._features(text):
+                # crc32 is stable between runs, unlike the built-in hash()
+                h = zlib.crc32(feature.encode("utf-8"))
+                bucket = (h % self.dim, 1.0 if h & 0x80000000 else -1.0)
+                counts[bucket] = counts.get(bucket, 0) + 1
+            for (index, sign), tf in counts.items():
+                vectors[row, index] += sign * (1.0 + np.log(tf))
+        return normalize_rows(vectors)
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        return self._embed(texts)
+
+    def embed_queries(self, texts: List[str]) -> np.ndarray:
+        return self._embed(texts)
+
+
+class GeminiEmbedder:
+    """Embeddings from the Gemini API"""
+
+    def __init__(self, model_name: str, rate_limited: bool = True):
+        """
+        Args:
+            model_name: Gemini embedding model
+            rate_limited: Go through the shared client's token bucket and
+                retries; when False, quota errors reach the caller so it can
+                run its own rate control (as bulk ingestion does)
+        """
+        self.model_name = model_name
+        self.rate_limited = rate_limited
+
+    def _embed(self, texts: List[str], task_type: str) -> np.ndarray:
+        # Imported lazily so the local embedder works without the Gemini SDK
+        if self.rate_limited:
+            from app.services.llm_client import get_llm_client
+            return normalize_rows(get_llm_client().embed(texts, self.model_name, task_type))
+        import google.generativeai as genai
+        genai.configure(api_key=settings.gemini_api_key)
+        result = genai.embed_content(model=self.model_name, content=texts, task_type=task_type)
+        return normalize_rows(result["embedding"])
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        return self._embed(texts, "retrieval_document")
+
+    def embed_queries(self, texts: List[str]) -> np.ndarray:
+        return self._embed(texts, "retrieval_query")
+
+
+def get_embedder(model_name: str = "", rate_limited: bool = True, cached: bool = True):
+    """
+    Return the embedder for a model name.
+
+    Args:
+        model_name: 'hashing-<dim>' for the local embedder, otherwise a
+            Gemini embedding model; empty picks Gemini when an API key is
+            configured and the local embedder when not
+        rate_limited: Passed to GeminiEmbedder
+        cached: Serve Gemini embeddings from the embedding cache (the
+            local embedder is cheaper to rerun than to look up)
+
+    Returns:
+        An embedder with model_name, embed_documents and embed_queries
+    """
+    if not model_name:
+        model_name = settings.embedding_model if settings.gemini_api_key else f"{HASHING_PREFIX}{settings.local_embedding_dim}"
+    if model_name.startswith(HASHING_PREFIX):
+        return HashingEmbedder(int(model_name[len(HASHING_PREFIX):]))
+    embedder = GeminiEmbedder(model_name, rate_limited)
+    return CachedEmbedder(embedder, get_embedding_cache()) if cached else embedder
@@ -0,0 +1,217 @@
+"""
+Local index of anchored evidence.
+A SQLite file records every evidence item we anchored (its digest, Merkle
+root, leaf index and proof) and every root and directly registered digest
+seen on chain. It is filled from our own submissions and by replaying
+contract events, so integrity checks are answered locally instead of with
+one RPC round-trip per hash.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import os
+import sqlite3
+import threading
+
+
+class EvidenceIndex:
+    """Thread-safe SQLite store of evidence digests and anchored roots"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite file; its directory is created if missing
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # Identical reports share a digest, so evidence items are keyed by their own ID
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS evidence_items ("
+            "evidence_id TEXT PRIMARY KEY, digest TEXT NOT NULL, root TEXT, leaf_index INTEGER, "
+            "leaf_count INTEGER, proof TEXT, tx_id TEXT, created_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS evidence_digest ON evidence_items (digest)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS evidence_root ON evidence_items (root)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS roots ("
+            "root TEXT PRIMARY KEY, leaf_count INTEGER, tx_hash TEXT, "
+            "block_number INTEGER, timestamp INTEGER)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS roots_tx ON roots (tx_hash)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS digests ("
+            "digest TEXT PRIMARY KEY, tx_hash TEXT, block_number INTEGER, timestamp INTEGER)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS digests_tx ON digests (tx_hash)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.commit()
+
+    def record_evidence(self, record: Dict[str, Any]) -> None:
+        """Insert or update one of our evidence items by evidence ID."""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO evidence_items (evidence_id, digest, root, leaf_index, leaf_count, proof, tx_id, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(evidence_id) DO UPDATE SET "
+                "root = COALESCE(excluded.root, root), "
+                "leaf_index = COALESCE(excluded.leaf_index, leaf_index), "
+                "leaf_count = COALESCE(excluded.leaf_count, leaf_count), "
+                "proof = COALESCE(excluded.proof, proof), "
+                "tx_id = COALESCE(excluded.tx_id, tx_id)",
+                (
+                    record["evidence_id"],
+                    record["digest"],
+                    record.get("root"),
+                    record.get("leaf_index"),
+                    record.get("leaf_count"),
+                    json.dumps(record["proof"]) if "proof" in record else None,
+                    record.get("tx_id"),
+                    record.get("created_at")
+                )
+            )
+            self._db.commit()
+
+    def record_root(
+        self,
+        root: str,
+        leaf_count: Optional[int] = None,
+        tx_hash: Optional[str] = None,
+        block_number: Optional[int] = None,
+        timestamp: Optional[int] = None
+    ) -> None:
+        """Insert or complete an anchored root."""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO roots (root, leaf_count, tx_hash, block_number, timestamp) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(root) DO UPDATE SET "
+                "leaf_count = COALESCE(excluded.leaf_count, leaf_count), "
+                "tx_hash = COALESCE(excluded.tx_hash, tx_hash), "
+                "block_number = COALESCE(excluded.block_number, block_number), "
+                "timestamp = COALESCE(excluded.timestamp, timestamp)",
+                (root, leaf_count, tx_hash, block_number, timestamp)
+            )
+            self._db.commit()
+
+    def record_digest(
+        self,
+        digest: str,
+        tx_hash: Optional[str] = None,
+        block_number: Optional[int] = None,
+        timestamp: Optional[int] = None
+    ) -> None:
+        """Insert or complete a digest registered directly in the contract."""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO digests (digest, tx_hash, block_number, timestamp) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT(digest) DO UPDATE SET "
+                "tx_hash = COALESCE(excluded.tx_hash, tx_hash), "
+                "block_number = COALESCE(excluded.block_number, block_number), "
+                "timestamp = COALESCE(excluded.timestamp, timestamp)",
+                (digest, tx_hash, block_number, timestamp)
+            )
+            self._db.commit()
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        record = {key: row[key] for key in row.keys() if row[key] is not None}
+        if "proof" in record:
+            record["proof"] = json.loads(record["proof"])
+        return record
+
+    def _evidence_query(self, where: str, params: Iterable[Any]) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT e.*, r.tx_hash, r.block_number, r.timestamp FROM evidence_items e "
+                f"LEFT JOIN roots r ON r.root = e.root WHERE {where} ORDER BY e.created_at",
+                list(params)
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def get_by_id(self, evidence_id: str) -> Optional[Dict[str, Any]]:
+        records = self._evidence_query("e.evidence_id = ?", [evidence_id])
+        return records[0] if records else None
+
+    def get_by_tx(self, tx_hash: str) -> List[Dict[str, Any]]:
+        """Return every indexed evidence item anchored by one transaction."""
+        return self._evidence_query("r.tx_hash = ?", [tx_hash])
+
+    def get_roots_by_tx(self, tx_hash: str) -> List[Dict[str, Any]]:
+        """Return the roots anchored by one transaction."""
+        with self._lock:
+            rows = self._db.execute("SELECT * FROM roots WHERE tx_hash = ?", (tx_hash,)).fetchall()
+        return [self._row(row) for row in rows]
+
+    def get_digests_by_tx(self, tx_hash: str) -> List[Dict[str, Any]]:
+        """Return the digests registered by one transaction."""
+        with self._lock:
+            rows = self._db.execute("SELECT * FROM digests WHERE tx_hash = ?", (tx_hash,)).fetchall()
+        return [self._row(row) for row in rows]
+
+    def lookup(self, digests: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Return indexed evidence for the given digests (missing ones are
+        omitted). Where several items share a digest, the earliest one with
+        a confirmed root wins, then the earliest one with any root.
+        """
+        found = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(digests), 500):
+            chunk = digests[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            for record in self._evidence_query(f"e.digest IN ({placeholders})", chunk):
+                best = found.get(record["digest"])
+                rank = (bool(record.get("timestamp")), "root" in record)
+                if best is None or rank > (bool(best.get("timestamp")), "root" in best):
+                    found[record["digest"]] = record
+        return found
+
+    def _confirmed(self, table: str, column: str, values: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        for start in range(0, len(values), 500):
+            chunk = values[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT * FROM {table} WHERE {column} IN ({placeholders}) AND timestamp IS NOT NULL", chunk
+                ).fetchall()
+            for row in rows:
+                found[row[column]] = self._row(row)
+        return found
+
+    def roots(self, roots: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Return the anchored roots among the given ones."""
+        return self._confirmed("roots", "root", roots)
+
+    def registered(self, digests: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Return the directly registered digests among the given ones."""
+        return self._confirmed("digests", "digest", digests)
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            evidence = self._db.execute("SELECT COUNT(*) FROM evidence_items").fetchone()[0]
+            roots = self._db.execute("SELECT COUNT(*) FROM roots").fetchone()[0]
+            digests = self._db.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+        return {
+            "evidence": evidence,
+            "roots": roots,
+            "registered_digests": digests,
+            "synced_block": self.get_meta("synced_block")
+        }
@@ -0,0 +1,394 @@
+"""
+Deterministic fact extraction for legal statements.
+Pulls dates, times, vehicle numbers, amounts, counts of accused and places
+out of English and transliterated Indic text with precompiled regexes and
+gazetteers, and flags hard mismatches between statements without an LLM.
+"""
+
+from typing import Dict, Any, List, Tuple
+import re
+
+_MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3,
+    "apr": 4, "april": 4, "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7,
+    "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9,
+    "oct": 10, "october": 10, "nov": 11, "november": 11, "dec": 12, "december": 12,
+}
+
+# English and transliterated Hindi/Urdu number words
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "ek": 1, "teen": 3, "tin": 3, "char": 4, "chaar": 4, "paanch": 5,
+    "panch": 5, "chhe": 6, "chhah": 6, "che": 6, "saat": 7, "aath": 8,
+    "aanth": 8, "nau": 9, "das": 10, "dus": 10,
+}
+
+# Hindi number words that are also English words ("do", "sat"); only
+# counted directly before a Hindi noun for people
+_INDIC_ONLY_NUMBER_WORDS = {"do": 2, "sat": 7}
+
+_MULTIPLIERS = {
+    "thousand": 1_000, "hazaar": 1_000, "hazar": 1_000, "hajar": 1_000,
+    "lakh": 100_000, "lakhs": 100_000, "lac": 100_000, "lacs": 100_000,
+    "crore": 10_000_000, "crores": 10_000_000, "karod": 10_000_000,
+}
+
+# Period-of-day words that disambiguate 12-hour times
+_DAY_PERIODS = {
+    "subah": "am", "savere": "am", "morning": "am",
+    "dopahar": "pm", "afternoon": "pm",
+    "shaam": "pm", "sham": "pm", "evening": "pm",
+    "raat": "night", "night": "night",
+}
+
+PLACE_GAZETTEER = (
+    "Agra", "Ahmedabad", "Ajmer", "Aligarh", "Allahabad", "Amritsar", "Aurangabad",
+    "Bareilly", "Bengaluru", "Bangalore", "Bhopal", "Bhubaneswar", "Chandigarh",
+    "Chennai", "Coimbatore", "Cuttack", "Dehradun", "Delhi", "New Delhi", "Dhanbad",
+    "Faridabad", "Ghaziabad", "Gorakhpur", "Gurugram", "Gurgaon", "Guwahati",
+    "Gwalior", "Hyderabad", "Indore", "Jabalpur", "Jaipur", "Jalandhar", "Jammu",
+    "Jodhpur", "Kanpur", "Kochi", "Kolkata", "Kota", "Kozhikode", "Lucknow",
+    "Ludhiana", "Madurai", "Meerut", "Mumbai", "Mysuru", "Mysore", "Nagpur",
+    "Nashik", "Noida", "Patna", "Prayagraj", "Pune", "Raipur", "Rajkot", "Ranchi",
+    "Shimla", "Srinagar", "Surat", "Thane", "Thiruvananthapuram", "Udaipur",
+    "Vadodara", "Varanasi", "Vijayawada", "Visakhapatnam",
+    "Bombay", "Calcutta", "Madras", "Poona", "Baroda", "Benares", "Banaras",
+    "Cochin", "Calicut", "Trivandrum", "Vizag",
+)
+
+# Former names and alternate spellings => the name places are compared by
+PLACE_ALIASES = {
+    "new delhi": "delhi", "bangalore": "bengaluru", "gurgaon": "gurugram",
+    "allahabad": "prayagraj", "mysore": "mysuru", "bombay": "mumbai",
+    "calcutta": "kolkata", "madras": "chennai", "poona": "pune", "baroda": "vadodara",
+    "benares": "varanasi", "banaras": "varanasi", "cochin": "kochi",
+    "calicut": "kozhikode", "trivandrum": "thiruvananthapuram", "vizag": "visakhapatnam",
+}
+
+_MONTH_ALT = "|".join(sorted(_MONTHS, key=len, reverse=True))
+_MULTIPLIER_ALT = "|".join(sorted(_MULTIPLIERS, key=len, reverse=True))
+_NUMBER_ALT = "|".join(sorted(_NUMBER_WORDS, key=len, reverse=True))
+
+_NUMERIC_DATE = re.compile(r"\b(\d{1,2})[./-](\d{1,2})[./-](\d{4}|\d{2})\b")
+_DAY_MONTH_DATE = re.compile(
+    rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH_ALT})\.?(?:,?\s+(\d{{4}}))?\b",
+    re.IGNORECASE
+)
+_MONTH_DAY_DATE = re.compile(
+    rf"\b({_MONTH_ALT})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(\d{{4}}))?\b",
+    re.IGNORECASE
+)
+
+_MERIDIEM_TIME = re.compile(
+    r"\b(\d{1,2})(?:[:.](\d{2}))?\s*([ap])\.?\s?m\b",
+    re.IGNORECASE
+)
+_CLOCK_TIME = re.compile(
+    rf"\b(?:({'|'.join(_DAY_PERIODS)})\s+(?:ke\s+|ko\s+|at\s+|around\s+|about\s+)?)?"
+    r"(\d{1,2})(?:[:.](\d{2}))?\s*(?:o'?\s?clock|baje|bajkar)\b",
+    re.IGNORECASE
+)
+_COLON_TIME = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)\b")
+
+_VEHICLE_NUMBER = re.compile(r"\b([A-Z]{2})[\s-]?(\d{1,2})[\s-]?([A-Z]{1,3})[\s-]?(\d{4})\b")
+
+_AMOUNT_PREFIXED = re.compile(
+    rf"(?:\brs\b\.?|\binr\b|₹)\s*(\d[\d,]*(?:\.\d+)?)\s*({_MULTIPLIER_ALT})?\b",
+    re.IGNORECASE
+)
+_AMOUNT_SUFFIXED = re.compile(
+    rf"\b(\d[\d,]*(?:\.\d+)?)\s*({_MULTIPLIER_ALT})?\s*(?:rupees|rupaye|rupaiye|rupay)\b",
+    re.IGNORECASE
+)
+
+_ACCUSED_COUNT = re.compile(
+    rf"\b(\d{{1,2}}|{_NUMBER_ALT})\s+"
+    r"(?:(?:unknown|unidentified|armed|masked|young|ajnabi|nakabposh)\s+)?"
+    r"(men|persons|people|accused|boys|assailants|attackers|miscreants|robbers|"
+    r"culprits|youths|aadmi|admi|log|ladke|badmash|chor)\b",
+    re.IGNORECASE
+)
+_INDIC_ACCUSED_COUNT = re.compile(
+    rf"\b({'|'.join(_INDIC_ONLY_NUMBER_WORDS)})\s+"
+    r"(?:(?:ajnabi|nakabposh)\s+)?"
+    r"(aadmi|admi|log|ladke|badmash|chor)\b",
+    re.IGNORECASE
+)
+
+_GAZETTEER = re.compile(
+    r"\b(" + "|".join(re.escape(p) for p in sorted(PLACE_GAZETTEER, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE
+)
+_LANDMARK = re.compile(
+    r"\b((?:[A-Z][a-z]+\s){0,3}(?:Chowk|Market|Bazaar|Bazar|Nagar|Colony|Road|Marg|"
+    r"Station|Gate|Bridge|Mandi|Ganj|Mohalla|Village|Gaon|Police Station|Bus Stand))\b"
+)
+
+FACT_TYPES = ("dates", "times", "vehicle_numbers", "amounts", "accused_counts", "places")
+
+FACT_LABELS = {
+    "dates": "Date",
+    "times": "Time",
+    "vehicle_numbers": "Vehicle number",
+    "amounts": "Amount",
+    "accused_counts": "Number of accused",
+    "places": "Place",
+}
+
+
+def _year(raw: str) -> int:
+    year = int(raw)
+    return year + 2000 if year < 100 else year
+
+
+def _date_value(day: int, month: int, year) -> Dict[str, Any]:
+    return {"day": day, "month": month, "year": year}
+
+
+def _extract_dates(text: str) -> List[Dict[str, Any]]:
+    dates = []
+    for match in _NUMERIC_DATE.finditer(text):
+        day, month = int(match.group(1)), int(match.group(2))
+        if 1 <= day <= 31 and 1 <= month <= 12:
+            dates.append({"text": match.group(0), "value": _date_value(day, month, _year(match.group(3)))})
+    for match in _DAY_MONTH_DATE.finditer(text):
+        day = int(match.group(1))
+        if 1 <= day <= 31:
+            year = _year(match.group(3)) if match.group(3) else None
+            dates.append({"text": match.group(0), "value": _date_value(day, _MONTHS[match.group(2).lower()], year)})
+    for match in _MONTH_DAY_DATE.finditer(text):
+        day = int(match.group(2))
+        if 1 <= day <= 31:
+            year = _year(match.group(3)) if match.group(3) else None
+            dates.append({"text": match.group(0), "value": _date_value(day, _MONTHS[match.group(1).lower()], year)})
+    return dates
+
+
+def _clock_candidates(hour: int, minute: int, period: str) -> List[str]:
+    """Return the 24-hour readings a 12-hour time could mean."""
+    if hour > 23 or minute > 59:
+        return []
+    if hour > 12 or period == "24h":
+        return [f"{hour:02d}:{minute:02d}"]
+    if period == "am":
+        return [f"{hour % 12:02d}:{minute:02d}"]
+    if period == "pm":
+        return [f"{hour % 12 + 12:02d}:{minute:02d}"]
+    if period == "night":
+        # "raat 11 baje" is 23:00 but "raat 2 baje" is 02:00
+        hour24 = hour + 12 if 6 <= hour <= 11 else hour % 12
+        return [f"{hour24:02d}:{minute:02d}"]
+    return [f"{hour % 12:02d}:{minute:02d}", f"{hour % 12 + 12:02d}:{minute:02d}"]
+
+
+def _extract_times(text: str) -> List[Dict[str, Any]]:
+    times = []
+    taken: List[Tuple[int, int]] = []
+
+    def free(span: Tuple[int, int]) -> bool:
+        return all(span[1] <= start or span[0] >= end for start, end in taken)
+
+    for match in _MERIDIEM_TIME.finditer(text):
+        hour, minute = int(match.group(1)), int(match.group(2) or 0)
+        candidates = _clock_candidates(hour, minute, match.group(3).lower() + "m")
+        if candidates:
+            times.append({"text": match.group(0).strip(), "value": candidates})
+            taken.append(match.span())
+    for match in _CLOCK_TIME.finditer(text):
+        if not free(match.span()):
+            continue
+        period = _DAY_PERIODS.get((match.group(1) or "").lower(), "")
+        candidates = _clock_candidates(int(match.group(2)), int(match.group(3) or 0), period)
+        if candidates:
+            times.append({"text": match.group(0), "value": candidates})
+            taken.append(match.span())
+    for match in _COLON_TIME.finditer(text):
+        if not free(match.span()):
+            continue
+        hour = int(match.group(1))
+        period = "24h" if hour == 0 or hour > 12 or match.group(1).startswith("0") else ""
+        candidates = _clock_candidates(hour, int(match.group(2)), period)
+        times.append({"text": match.group(0), "value": candidates})
+    return times
+
+
+def _extract_vehicle_numbers(text: str) -> List[Dict[str, Any]]:
+    vehicles = []
+    for match in _VEHICLE_NUMBER.finditer(text):
+        # "ON 12 MAR 2023" in an all-caps FIR has the same shape as a plate
+        if match.group(3).lower() in _MONTHS:
+            continue
+        vehicles.append({"text": match.group(0), "value": "".join(match.groups())})
+    return vehicles
+
+
+def _amount_value(number: str, multiplier: str) -> int:
+    value = float(number.replace(",", ""))
+    if multiplier:
+        value *= _MULTIPLIERS[multiplier.lower()]
+    return int(round(value))
+
+
+def _extract_amounts(text: str) -> List[Dict[str, Any]]:
+    amounts = []
+    seen_spans = []
+    for pattern in (_AMOUNT_PREFIXED, _AMOUNT_SUFFIXED):
+        for match in pattern.finditer(text):
+            if any(match.start() < end and match.end() > start for start, end in seen_spans):
+                continue
+            seen_spans.append(match.span())
+            amounts.append({"text": match.group(0).strip(), "value": _amount_value(match.group(1), match.group(2))})
+    return amounts
+
+
+def _extract_accused_counts(text: str) -> List[Dict[str, Any]]:
+    counts = []
+    for match in _ACCUSED_COUNT.finditer(text):
+        raw = match.group(1).lower()
+        value = int(raw) if raw.isdigit() else _NUMBER_WORDS[raw]
+        counts.append({"text": match.group(0), "value": value})
+    for match in _INDIC_ACCUSED_COUNT.finditer(text):
+        counts.append({"text": match.group(0), "value": _INDIC_ONLY_NUMBER_WORDS[match.group(1).lower()]})
+    return counts
+
+
+def _extract_places(text: str) -> List[Dict[str, Any]]:
+    places = []
+    for match in _GAZETTEER.finditer(text):
+        name = re.sub(r"\s+", " ", match.group(1).lower())
+        places.append({"text": match.group(0), "value": PLACE_ALIASES.get(name, name), "kind": "city"})
+    for match in _LANDMARK.finditer(text):
+        places.append({"text": match.group(0), "value": match.group(1).lower(), "kind": "landmark"})
+    return places
+
+
+def extract_facts(text: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Extract mechanically comparable facts from a statement.
+
+    Args:
+        text: FIR or witness statement text
+
+    Returns:
+        Dictionary mapping each fact type to a list of {"text", "value"} matches
+    """
+    text = text or ""
+    return {
+        "dates": _extract_dates(text),
+        "times": _extract_times(text),
+        "vehicle_numbers": _extract_vehicle_numbers(text),
+        "amounts": _extract_amounts(text),
+        "accused_counts": _extract_accused_counts(text),
+        "places": _extract_places(text),
+    }
+
+
+def _format_date(value: Dict[str, Any]) -> str:
+    text = f"{value['day']:02d}-{value['month']:02d}"
+    return f"{text}-{value['year']}" if value["year"] else text
+
+
+def _dates_match(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    if (a["day"], a["month"]) != (b["day"], b["month"]):
+        return False
+    return not a["year"] or not b["year"] or a["year"] == b["year"]
+
+
+def _values_match(fact_type: str, a: Any, b: Any) -> bool:
+    if fact_type == "dates":
+        return _dates_match(a, b)
+    if fact_type == "times":
+        return bool(set(a) & set(b))
+    return a == b
+
+
+def _comparable(fact_type: str, facts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Different landmarks are usually complementary detail, not a contradiction
+    if fact_type == "places":
+        return [f for f in facts if f.get("kind") == "city"]
+    return facts
+
+
+def compare_facts(
+    facts_a: Dict[str, List[Dict[str, Any]]],
+    facts_b: Dict[str, List[Dict[str, Any]]],
+    label_a: str,
+    label_b: str
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Flag fact types both statements mention but with no value in common.
+
+    Args:
+        facts_a: Facts from the reference statement
+        facts_b: Facts from the compared statement
+        label_a: Display name of the reference statement (e.g. 'FIR')
+        label_b: Display name of the compared statement (e.g. 'Witness 1')
+
+    Returns:
+        Tuple of (discrepancies, number of fact types compared)
+    """
+    discrepancies = []
+    compared = 0
+    for fact_type in FACT_TYPES:
+        values_a = _comparable(fact_type, facts_a.get(fact_type, []))
+        values_b = _comparable(fact_type, facts_b.get(fact_type, []))
+        if not values_a or not values_b:
+            continue
+        compared += 1
+        if any(_values_match(fact_type, a["value"], b["value"]) for a in values_a for b in values_b):
+            continue
+        mentions_a = ", ".join(dict.fromkeys(f["text"] for f in values_a))
+        mentions_b = ", ".join(dict.fromkeys(f["text"] for f in values_b))
+        discrepancies.append({
+            "source": f"{label_b} vs {label_a}",
+            "details": f"{FACT_LABELS[fact_type]} mismatch: {label_a} states {mentions_a}; {label_b} states {mentions_b}",
+            "type": "fact",
+            "fact_type": fact_type
+        })
+    return discrepancies, compared
+
+
+def check_consistency(fir_text: str, witness_statements: List[str]) -> Dict[str, Any]:
+    """
+    Compare extracted facts across the FIR and every witness statement.
+
+    Args:
+        fir_text: First Information Report text
+        witness_statements: List of Witness statement texts
+
+    Returns:
+        Dictionary with fact-level discrepancies, a similarity score over
+        the compared fact types and the extracted facts per document
+    """
+    fir_facts = extract_facts(fir_text)
+    witness_facts = [extract_facts(stmt) for stmt in witness_statements]
+
+    discrepancies = []
+    compared = 0
+    for i, facts in enumerate(witness_facts):
+        found, count = compare_facts(fir_facts, facts, "FIR", f"Witness {i+1}")
+        discrepancies.extend(found)
+        compared += count
+    for i in range(len(witness_facts)):
+        for j in range(i + 1, len(witness_facts)):
+            found, count = compare_facts(witness_facts[i], witness_facts[j], f"Witness {i+1}", f"Witness {j+1}")
+            discrepancies.extend(found)
+            compared += count
+
+    return {
+        "discrepancies": discrepancies,
+        "similarity_score": 1 - len(discrepancies) / compared if compared else 1.0,
+        "facts_compared": compared,
+        "facts": {
+            "fir": fir_facts,
+            "witnesses": witness_facts
+        }
+    }
+
+
+def format_known_discrepancies(discrepancies: List[Dict[str, Any]]) -> str:
+    """Render fact mismatches for inclusion in an LLM prompt."""
+    if not discrepancies:
+        return "None"
+    return "\n".join(f"- {d['source']}: {d['details']}" for d in discrepancies)
@@ -0,0 +1,233 @@
+"""
+In-memory lexical index over the IPC sections in ipc_chunks_final.json.
+Built once per process: a section-number map for O(1) lookup, a BM25
+inverted index over titles, keywords and law text, and a citation
+detector for references such as "u/s 302/34 IPC". No network involved.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from collections import Counter, defaultdict
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from app.core.config import settings
+
+IPC_DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "ipc_chunks_final.json")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset("""
+a an and any are as at be by for from has have he her his if in is it its may of on or
+such that the their them then there these this to was which who whoever with shall be
+being been under section sections ipc indian penal code punishment according simple words
+description also other than not into upon person
+""".split())
+
+# One section reference: 302, 304B, 376(2), 376(2)(g)
+_SECTION = r"\d{1,3}[A-Z]{0,2}(?:\s*\(\s*\w{1,3}\s*\))*"
+# Runs of joiners such as ", r/w" or "and read with" between references
+_JOIN = r"(?:\s*(?:/|,|&|\band\b|\bor\b|r\s*/\s*w|read\s+with))+\s*"
+_OF = r"\s*(?:of\s+(?:the\s+)?)?"
+_ACT = (
+    r"I\.?\s?P\.?\s?C\.?|Indian\s+Penal\s+Code|"
+    r"Cr\.?\s?P\.?\s?C\.?|NDPS|(?-i:(?:[A-Z][A-Za-z.]*\s+)+Act)"
+)
+_CITATION = re.compile(
+    r"(?:\bu\s*/\s*s(?:ec)?\.?|\bunder\s+sec(?:tion)?s?\.?|\bsec(?:tion)?s?\.?|धारा|धाराओं)\s*"
+    rf"(?P<sections>{_SECTION}(?:{_JOIN}{_SECTION})*)"
+    # References continued after the act: 'u/s 420 IPC, r/w 120B'
+    rf"(?:{_OF}(?P<act>{_ACT})(?P<more>(?:{_JOIN}{_SECTION})+)?(?:{_OF}(?P<more_act>{_ACT}))?)?",
+    re.IGNORECASE
+)
+_READ_WITH = re.compile(r"r\s*/\s*w|read\s+with", re.IGNORECASE)
+# Leading number of each reference; sub-clauses like (2)(g) are dropped
+_SECTION_NUMBER = re.compile(r"(?<![\w(])\d{1,3}[A-Z]{0,2}", re.IGNORECASE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords."""
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def _is_ipc(act: Optional[str]) -> Optional[bool]:
+    if not act:
+        return None
+    return act.replace(".", "").replace(" ", "").lower() in ("ipc", "indianpenalcode")
+
+
+class IPCIndex:
+    """Section lookup, BM25 search and citation detection over IPC chunks"""
+
+    def __init__(self, chunks: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            chunks: Entries of ipc_chunks_final.json
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+        """
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.by_section: Dict[str, List[int]] = defaultdict(list)
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths: List[int] = []
+
+        for doc_id, chunk in enumerate(chunks):
+            self.by_section[str(chunk["section_number"]).upper()].append(doc_id)
+            # Titles and keywords are counted twice so they outweigh body text
+            tokens = tokenize(" ".join([
+                chunk.get("section_title", ""),
+                chunk.get("section_title", ""),
+                " ".join(chunk.get("crime_keywords", []) * 2),
+                chunk.get("law_text", "")
+            ]))
+            self.doc_lengths.append(len(tokens))
+            for token, tf in Counter(tokens).items():
+                self.postings[token].append((doc_id, tf))
+
+        count = len(chunks)
+        self.avg_length = sum(self.doc_lengths) / count if count else 0.0
+        self.idf = {
+            token: math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for token, docs in self.postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def lookup(self, section_number: str) -> List[Dict[str, Any]]:
+        """Return every chunk for a section number (e.g. '302'), in file order."""
+        return [self.chunks[i] for i in self.by_section.get(str(section_number).strip().upper(), [])]
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Rank chunks for a free-text query with BM25.
+
+        Returns:
+            Up to k (chunk, score) pairs, best first
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for token, qtf in Counter(tokenize(query)).items():
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[token]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_length)
+                scores[doc_id] += qtf * idf * tf * (self.k1 + 1) / (tf + norm)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.chunks[doc_id], score) for doc_id, score in best]
+
+    def detect_citations(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Find section references such as 'u/s 302/34 IPC', 'under Sections
+        147, 148 and 149 of the Indian Penal Code' or 'धारा 302'.
+        References explicitly to another act (CrPC, NDPS, ...) are skipped.
+
+        Returns:
+            One entry per cited section in order of first mention, with
+            'section', 'citation' (matched text), 'explicit_ipc' and 'known'
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        for match in _CITATION.finditer(text):
+            explicit = _is_ipc(match.group("act"))
+            sections = _SECTION_NUMBER.findall(match.group("sections")) if explicit is not False else []
+            more = match.group("more")
+            if more:
+                # A bare number after the act only continues the citation when read with it
+                more_explicit = _is_ipc(match.group("more_act"))
+                if more_explicit is None and _READ_WITH.search(more):
+                    more_explicit = explicit
+                if more_explicit:
+                    sections += _SECTION_NUMBER.findall(more)
+                    explicit = explicit or more_explicit
+            for number in sections:
+                number = number.upper()
+                # Lettered sections (e.g. 304B) fall back to their base number
+                base = number if number in self.by_section else re.sub(r"[A-Z]+$", "", number)
+                if base in found:
+                    continue
+                chunks = self.lookup(base)
+                found[base] = {
+                    "section": base,
+                    "title": chunks[0]["section_title"] if chunks else None,
+                    "citation": match.group(0).strip(),
+                    "explicit_ipc": bool(explicit),
+                    "known": bool(chunks)
+                }
+        return list(found.values())
+
+    def hybrid_search(
+        self,
+        query: str,
+        k: int = 5,
+        vector_sections: Optional[List[str]] = None,
+        alpha: float = 0.5
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank sections by blending BM25 with vector-store results.
+        Sections cited in the query are always ranked first.
+
+        Args:
+            query: Free text, e.g. FIR narrative
+            k: Number of sections to return
+            vector_sections: Section numbers from a vector retriever, best first
+            alpha: Weight of the lexical score (1 - alpha goes to the vector rank)
+
+        Returns:
+            Up to k dictionaries with 'section', 'title', 'text', 'score'
+            and 'sources'
+        """
+        combined: Dict[str, Dict[str, Any]] = {}
+
+        def entry(section: str) -> Dict[str, Any]:
+            if section not in combined:
+                chunks = self.lookup(section)
+                combined[section] = {
+                    "section": section,
+                    "title": chunks[0]["section_title"] if chunks else "",
+                    "text": chunks[0]["law_text"] if chunks else "",
+                    "score": 0.0,
+                    "sources": []
+                }
+            return combined[section]
+
+        lexical = self.search(query, k * 2)
+        top = lexical[0][1] if lexical else 0.0
+        for chunk, score in lexical:
+            item = entry(str(chunk["section_number"]).upper())
+            if "lexical" not in item["sources"]:
+                item["score"] += alpha * score / top
+                item["sources"].append("lexical")
+
+        for rank, section in enumerate(dict.fromkeys(vector_sections or [])):
+            item = entry(str(section).upper())
+            item["score"] += (1 - alpha) / (1 + rank)
+            item["sources"].append("vector")
+
+        for citation in self.detect_citations(query):
+            if citation["known"]:
+                item = entry(citation["section"])
+                item["score"] += 2.0
+                item["sources"].append("citation")
+
+        return heapq.nlargest(k, combined.values(), key=lambda item: item["score"])
+
+
+_index: Optional[IPCIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_ipc_index() -> IPCIndex:
+    """Return the process-wide IPC index, building it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                with open(settings.ipc_data_path or IPC_DATA_PATH, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                chunks = data if isinstance(data, list) else data.get("sections", [])
+                _index = IPCIndex(chunks, settings.bm25_k1, settings.bm25_b)
+    return _index
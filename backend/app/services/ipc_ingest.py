@@ -0,0 +1,395 @@
+"""
+Incremental ingestion of IPC sections into the vector store.
+Every chunk gets a deterministic ID and a content hash stored with it, so a
+run embeds only new or edited chunks, upserts them in place and deletes
+chunks that left the source file. Finished batches are checkpointed and an
+interrupted run resumes from them instead of starting over.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+import numpy as np
+from app.core.config import settings
+from app.services.blob_store import canonical_json
+from app.services.embeddings import HASHING_PREFIX, collection_name, get_embedder
+from app.services.rate_limits import is_rate_limit_error
+from app.services.vector_store import NumpyVectorStore, ipc_document
+
+
+def section_records(sections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Turn ipc_chunks_final.json entries into records to embed.
+
+    Returns:
+        Records with 'id' (the chunk id plus its occurrence, e.g. IPC_171#3,
+        since sections split into several chunks share one id), 'hash',
+        'text' and 'metadata' (which carries the hash as content_hash)
+    """
+    seen: Dict[str, int] = {}
+    records = []
+    for section in sections:
+        document = ipc_document(section)
+        base = str(section.get("id") or f"IPC_{document['metadata']['section']}")
+        occurrence = seen.get(base, 0)
+        seen[base] = occurrence + 1
+        content_hash = hashlib.sha256(
+            canonical_json([document["text"], document["metadata"]]).encode("utf-8")
+        ).hexdigest()
+        records.append({
+            "id": f"{base}#{occurrence}",
+            "hash": content_hash,
+            "text": document["text"],
+            "metadata": {**document["metadata"], "content_hash": content_hash}
+        })
+    return records
+
+
+def plan_ingestion(records: List[Dict[str, Any]], existing: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Compare wanted records with what the target already holds.
+
+    Args:
+        records: Output of section_records
+        existing: Stored id -> content hash
+
+    Returns:
+        Dictionary with 'upsert' (records to embed), 'delete' (stale ids)
+        and 'unchanged' (count)
+    """
+    wanted = {record["id"] for record in records}
+    upsert = [record for record in records if existing.get(record["id"]) != record["hash"]]
+    return {
+        "upsert": upsert,
+        "delete": [doc_id for doc_id in existing if doc_id not in wanted],
+        "unchanged": len(records) - len(upsert)
+    }
+
+
+class NumpyIngestTarget:
+    """
+    Rewrites a NumpyVectorStore collection, reusing the rows of unchanged
+    chunks. Embedded batches are appended to <collection>.checkpoint.jsonl
+    until the collection is written.
+    """
+
+    def __init__(self, directory: str, collection: str, model: str):
+        self.directory = directory
+        self.collection = collection
+        self.model = model
+        self.checkpoint_path = os.path.join(directory, f"{collection}.checkpoint.jsonl")
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._hashes: Dict[str, str] = {}
+        try:
+            store = NumpyVectorStore(directory, collection)
+        except FileNotFoundError:
+            store = None
+        except ValueError as e:
+            # A crash between the matrix and sidecar renames; the checkpoint still has the new rows
+            print(f"Vector store {collection} is corrupt ({e}); rebuilding it")
+            store = None
+        # Rows embedded by another model cannot be mixed in; they are all redone
+        if store is not None and store.model == model:
+            for row, (doc_id, metadata) in enumerate(zip(store.ids, store.metadatas)):
+                if metadata.get("content_hash"):
+                    self._hashes[doc_id] = metadata["content_hash"]
+                    self._vectors[doc_id] = np.asarray(store.matrix[row])
+        self.resumed = self._load_checkpoint()
+
+    def _load_checkpoint(self) -> int:
+        resumed = 0
+        if not os.path.exists(self.checkpoint_path):
+            return resumed
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash can leave the last line half-written
+                    continue
+                if entry["model"] == self.model:
+                    self._hashes[entry["id"]] = entry["hash"]
+                    self._vectors[entry["id"]] = np.asarray(entry["vector"], dtype=np.float32)
+                    resumed += 1
+        return resumed
+
+    def existing_hashes(self) -> Dict[str, str]:
+        return dict(self._hashes)
+
+    def upsert(self, records: List[Dict[str, Any]], vectors: np.ndarray) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+            for record, vector in zip(records, vectors):
+                f.write(json.dumps({
+                    "id": record["id"],
+                    "hash": record["hash"],
+                    "model": self.model,
+                    "vector": [float(x) for x in vector]
+                }) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        for record, vector in zip(records, vectors):
+            self._hashes[record["id"]] = record["hash"]
+            self._vectors[record["id"]] = np.asarray(vector, dtype=np.float32)
+
+    def delete(self, ids: List[str]) -> None:
+        for doc_id in ids:
+            self._hashes.pop(doc_id, None)
+            self._vectors.pop(doc_id, None)
+
+    def finish(self, records: List[Dict[str, Any]]) -> None:
+        """Write the collection in source order and drop the checkpoint."""
+        NumpyVectorStore.write(
+            self.directory,
+            self.collection,
+            self.model,
+            [record["id"] for record in records],
+            np.stack([self._vectors[record["id"]] for record in records]) if records else np.zeros((0, 1), dtype=np.float32),
+            [record["text"] for record in records],
+            [record["metadata"] for record in records]
+        )
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+
+class ChromaIngestTarget:
+    """
+    Upserts into a Chroma collection by ID. Every batch is persisted as it
+    lands, so the stored hashes are the checkpoint.
+    """
+
+    def __init__(self, client, collection: str):
+        self.collection = client.get_or_create_collection(collection)
+        self.resumed = 0
+
+    def existing_hashes(self) -> Dict[str, str]:
+        stored = self.collection.get(include=["metadatas"])
+        return {
+            doc_id: (metadata or {}).get("content_hash", "")
+            for doc_id, metadata in zip(stored["ids"], stored["metadatas"])
+        }
+
+    def upsert(self, records: List[Dict[str, Any]], vectors: np.ndarray) -> None:
+        self.collection.upsert(
+            ids=[record["id"] for record in records],
+            embeddings=[[float(x) for x in vector] for vector in vectors],
+            documents=[record["text"] for record in records],
+            metadatas=[record["metadata"] for record in records]
+        )
+
+    def delete(self, ids: List[str]) -> None:
+        if ids:
+            self.collection.delete(ids=ids)
+
+    def finish(self, records: List[Dict[str, Any]]) -> None:
+        pass
+
+
+class NullIngestTarget:
+    """Holds nothing and stores nothing; used for dry runs"""
+
+    resumed = 0
+
+    def existing_hashes(self) -> Dict[str, str]:
+        return {}
+
+    def upsert(self, records: List[Dict[str, Any]], vectors: np.ndarray) -> None:
+        pass
+
+    def delete(self, ids: List[str]) -> None:
+        pass
+
+    def finish(self, records: List[Dict[str, Any]]) -> None:
+        pass
+
+
+class AIMDLimiter:
+    """
+    Concurrency limit with additive increase and multiplicative decrease.
+    Each success grows the limit by 1/limit (about +1 per window of
+    requests); a throttled request halves it, at most once per window, and
+    pauses new requests for a backoff that doubles while throttling lasts.
+    """
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1, decrease: float = 0.5, max_backoff: float = 60.0):
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.max_backoff = max_backoff
+        self.in_flight = 0
+        self.throttled = 0
+        self._epoch = 0
+        self._streak = 0
+        self._resume_at = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> int:
+        """Wait for a free slot; returns the window the request started in."""
+        while True:
+            async with self._cond:
+                await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+                delay = self._resume_at - time.monotonic()
+                if delay <= 0:
+                    self.in_flight += 1
+                    return self._epoch
+            await asyncio.sleep(delay)
+
+    async def release(self, epoch: int, throttled: bool = False) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                # Requests already in flight when we backed off don't count again
+                if epoch == self._epoch:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._epoch += 1
+                    backoff = min(self.max_backoff, 2.0 ** self._streak)
+                    self._resume_at = time.monotonic() + random.uniform(0.5, 1.0) * backoff
+                    self._streak += 1
+            else:
+                self._streak = 0
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+def ingest_sections(
+    sections: List[Dict[str, Any]],
+    target,
+    embedder,
+    batch_size: int = 32,
+    on_batch: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, Any]:
+    """
+    Bring a target in line with the given sections.
+
+    Args:
+        sections: ipc_chunks_final.json entries
+        target: NumpyIngestTarget or ChromaIngestTarget
+        embedder: Embedder whose model the target was opened for
+        batch_size: Records per embedding call
+        on_batch: Called with (done, total) after each batch
+
+    Returns:
+        Counts of 'embedded', 'unchanged', 'deleted' and 'resumed' chunks
+    """
+    records = section_records(sections)
+    plan = plan_ingestion(records, target.existing_hashes())
+    upsert = plan["upsert"]
+    for start in range(0, len(upsert), batch_size):
+        batch = upsert[start:start + batch_size]
+        target.upsert(batch, embedder.embed_documents([record["text"] for record in batch]))
+        if on_batch is not None:
+            on_batch(start + len(batch), len(upsert))
+    # Stale chunks go last so a failed run never leaves the collection short
+    target.delete(plan["delete"])
+    target.finish(records)
+    return {
+        "embedded": len(upsert),
+        "unchanged": plan["unchanged"],
+        "deleted": len(plan["delete"]),
+        "resumed": target.resumed
+    }
+
+
+def open_ipc_store(directory: str, base: str, model_name: str, sections: List[Dict[str, Any]]) -> NumpyVectorStore:
+    """
+    Open the collection for an embedding model. When it is missing or
+    corrupt, fall back to the local embedder's collection, ingesting that
+    one if needed (a few hundred chunks take well under a second).
+    """
+    collection = collection_name(base, model_name)
+    try:
+        return NumpyVectorStore(directory, collection)
+    except FileNotFoundError:
+        print(f"Vector store {collection} not found in {directory}; using the local embedder")
+    except ValueError as e:
+        print(f"Vector store {collection} is corrupt ({e}); using the local embedder until it is re-ingested")
+    embedder = get_embedder(f"{HASHING_PREFIX}{settings.local_embedding_dim}")
+    collection = collection_name(base, embedder.model_name)
+    try:
+        return NumpyVectorStore(directory, collection)
+    except (FileNotFoundError, ValueError):
+        # Rebuilt from scratch (or from the checkpoint of an interrupted write)
+        pass
+    ingest_sections(sections, NumpyIngestTarget(directory, collection, embedder.model_name), embedder)
+    return NumpyVectorStore(directory, collection)
+
+
+async def ingest_sections_async(
+    sections: List[Dict[str, Any]],
+    target,
+    embedder,
+    batch_size: int,
+    limiter: AIMDLimiter,
+    on_progress: Optional[Callable[[int, int, float], None]] = None,
+    max_retries: int = 8
+) -> Dict[str, Any]:
+    """
+    Like ingest_sections, but embeds batches concurrently under an AIMD
+    limit. Quota errors shrink the limit and retry the batch once the
+    limiter's backoff ends; any other error stops the run (finished batches
+    stay checkpointed).
+
+    Args:
+        on_progress: Called with (done, total, elapsed seconds) after each batch
+
+    Returns:
+        Counts as for ingest_sections, plus 'seconds', 'docs_per_second',
+        'throttled' and the final 'concurrency'
+    """
+    records = section_records(sections)
+    plan = plan_ingestion(records, target.existing_hashes())
+    upsert = plan["upsert"]
+    batches = [upsert[start:start + batch_size] for start in range(0, len(upsert), batch_size)]
+    write_lock = asyncio.Lock()
+    started = time.monotonic()
+    done = 0
+
+    async def run_batch(batch: List[Dict[str, Any]]) -> None:
+        nonlocal done
+        texts = [record["text"] for record in batch]
+        for attempt in range(max_retries + 1):
+            epoch = await limiter.acquire()
+            try:
+                vectors = await asyncio.to_thread(embedder.embed_documents, texts)
+            except Exception as e:
+                throttled = is_rate_limit_error(e)
+                await limiter.release(epoch, throttled)
+                if not throttled or attempt == max_retries:
+                    raise
+                # The limiter holds every batch back until its backoff ends
+                continue
+            await limiter.release(epoch)
+            async with write_lock:
+                await asyncio.to_thread(target.upsert, batch, vectors)
+                done += len(batch)
+                if on_progress is not None:
+                    on_progress(done, len(upsert), time.monotonic() - started)
+            return
+
+    tasks = [asyncio.ensure_future(run_batch(batch)) for batch in batches]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    target.delete(plan["delete"])
+    target.finish(records)
+    seconds = time.monotonic() - started
+    return {
+        "embedded": len(upsert),
+        "unchanged": plan["unchanged"],
+        "deleted": len(plan["delete"]),
+        "resumed": target.resumed,
+        "seconds": seconds,
+        "docs_per_second": len(upsert) / seconds if seconds else 0.0,
+        "throttled": limiter.throttled,
+        "concurrency": int(limiter.limit)
+    }
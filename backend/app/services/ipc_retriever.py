@@ -0,0 +1,209 @@
+"""
+Shared IPC section retriever.
+The vector store (a memory-mapped NumPy matrix by default, or Chroma) is
+opened once (at startup) and reused by every request;
+its results are blended with the in-memory lexical index, which keeps
+working offline. Retrieval runs on a small dedicated pool so callers can
+overlap it with their own preparation and collect the result with a deadline.
+"""
+
+from typing import Any, Dict, List, Optional
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from app.core.config import settings
+from app.services.embedding_cache import embedding_cache_stats
+from app.services.embeddings import HASHING_PREFIX, collection_name, get_embedder
+from app.services.ipc_index import get_ipc_index
+from app.services.ipc_ingest import open_ipc_store
+from app.services.vector_store import NumpyRetriever
+
+try:
+    import chromadb
+    from langchain_community.vectorstores import Chroma
+    from langchain_core.embeddings import Embeddings
+except ImportError:
+    chromadb = None
+    Embeddings = object
+
+_retriever = None
+_retriever_error: Optional[str] = None
+_retriever_failed_at = 0.0
+_retriever_lock = threading.Lock()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {"queries": 0, "errors": 0, "timeouts": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+
+class LangChainEmbeddings(Embeddings):
+    """Presents one of our embedders to LangChain, so Chroma queries share its cache and rate limit"""
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedder.embed_documents(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embedder.embed_queries([text])[0].tolist()
+
+
+def _open_numpy_retriever():
+    embedder = get_embedder()
+    store = open_ipc_store(settings.vector_store_dir, settings.ipc_collection, embedder.model_name, get_ipc_index().chunks)
+    if store.model != embedder.model_name:
+        embedder = get_embedder(store.model)
+    if not store.model.startswith(HASHING_PREFIX) and not settings.gemini_api_key:
+        raise Exception(f"{store.model} embeddings need a Gemini API Key")
+    return NumpyRetriever(store, settings.rag_top_k, embedder)
+
+
+def _open_chroma_retriever():
+    if chromadb is None:
+        raise Exception("chromadb / langchain not installed")
+    if not settings.gemini_api_key:
+        raise Exception("Gemini API Key not configured")
+    # Query embeddings go through the embedding cache and the shared Gemini limiter
+    embeddings = LangChainEmbeddings(get_embedder(settings.embedding_model))
+    # Connect to the SAME path and collection used by the ingestion script
+    persistent_client = chromadb.PersistentClient(path=settings.chroma_path)
+    db = Chroma(
+        client=persistent_client,
+        embedding_function=embeddings,
+        collection_name=collection_name(settings.ipc_collection, settings.embedding_model)
+    )
+    return db.as_retriever(search_kwargs={"k": settings.rag_top_k})
+
+
+def _open_retriever():
+    if settings.vector_backend == "chroma":
+        return _open_chroma_retriever()
+    return _open_numpy_retriever()
+
+
+def get_ipc_retriever():
+    """
+    Return the process-wide IPC retriever, opening the vector store on
+    first use. A failed open is not retried for rag_retry_seconds so
+    requests do not pay the reconnect cost.
+    """
+    global _retriever, _retriever_error, _retriever_failed_at
+    if _retriever is not None:
+        return _retriever
+    with _retriever_lock:
+        if _retriever is not None:
+            return _retriever
+        if _retriever_error and time.monotonic() - _retriever_failed_at < settings.rag_retry_seconds:
+            return None
+        try:
+            _retriever = _open_retriever()
+            _retriever_error = None
+        except Exception as e:
+            _retriever_error = str(e)
+            _retriever_failed_at = time.monotonic()
+            print(f"⚠️ Vector Store Error: {e}")
+        return _retriever
+
+
+def warm_ipc_retriever() -> bool:
+    """Build the lexical index and open the vector store ahead of the first request."""
+    get_ipc_index()
+    return get_ipc_retriever() is not None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.rag_max_concurrency,
+                    thread_name_prefix="ipc-retrieval"
+                )
+    return _executor
+
+
+def _record(elapsed_ms: float, outcome: Optional[str] = None) -> None:
+    with _stats_lock:
+        _stats["queries"] += 1
+        _stats["total_ms"] += elapsed_ms
+        _stats["max_ms"] = max(_stats["max_ms"], elapsed_ms)
+        if outcome:
+            _stats[outcome] += 1
+
+
+def retrieve_ipc_sections(query: str) -> Dict[str, Any]:
+    """
+    Fetch the IPC sections most relevant to a query.
+    Cited sections come first, then a blend of BM25 and vector ranks; the
+    vector store is skipped when it is unavailable.
+
+    Args:
+        query: Free text, typically the FIR narrative
+
+    Returns:
+        Dictionary with 'sections' (section, title, text, score, sources),
+        'status', 'vector_status' and latency in 'retrieval_ms' and
+        'lexical_ms'
+    """
+    started = time.perf_counter()
+    query = query[:settings.rag_query_chars]
+    vector_sections: List[str] = []
+    vector_status = "unavailable"
+    outcome = None
+    retriever = get_ipc_retriever()
+    if retriever is not None:
+        try:
+            documents = retriever.get_relevant_documents(query)
+            vector_sections = [doc.metadata.get("section") for doc in documents if doc.metadata.get("section")]
+            vector_status = "success"
+        except Exception as e:
+            vector_status = f"error: {e}"
+            outcome = "errors"
+
+    lexical_started = time.perf_counter()
+    sections = get_ipc_index().hybrid_search(query, settings.rag_top_k, vector_sections, settings.rag_hybrid_alpha)
+    lexical_ms = (time.perf_counter() - lexical_started) * 1000
+    for section in sections:
+        section["text"] = section["text"][:settings.rag_section_chars]
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _record(elapsed_ms, outcome)
+    return {
+        "status": "success",
+        "vector_status": vector_status,
+        "sections": sections,
+        "retrieval_ms": elapsed_ms,
+        "lexical_ms": lexical_ms
+    }
+
+
+def submit_retrieval(query: str) -> Future:
+    """Start retrieval in the background and return its future."""
+    return _get_executor().submit(retrieve_ipc_sections, query)
+
+
+def collect_retrieval(future: Optional[Future]) -> Dict[str, Any]:
+    """Wait for a submitted retrieval up to rag_timeout_seconds."""
+    if future is None:
+        return {"status": "disabled", "sections": [], "retrieval_ms": 0.0}
+    try:
+        return future.result(timeout=settings.rag_timeout_seconds)
+    except FutureTimeout:
+        with _stats_lock:
+            _stats["timeouts"] += 1
+        return {"status": "timeout", "sections": [], "retrieval_ms": settings.rag_timeout_seconds * 1000}
+
+
+def retriever_stats() -> Dict[str, Any]:
+    """Return retrieval counters and latency for the stats endpoint."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    snapshot["avg_ms"] = snapshot["total_ms"] / snapshot["queries"] if snapshot["queries"] else 0.0
+    snapshot["ready"] = _retriever is not None
+    snapshot["embedding_cache"] = embedding_cache_stats()
+    return snapshot
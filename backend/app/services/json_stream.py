@@ -0,0 +1,88 @@
+"""
+Incremental JSON parsing for streamed model output.
+The model writes one JSON document a few tokens at a time; this parser
+watches the text as it arrives and hands back each element of a chosen
+top-level array as soon as its closing brace is seen, long before the
+document is complete.
+"""
+
+from typing import Any, List, Optional
+import json
+
+
+class StreamingArrayParser:
+    """Yields the complete objects of one top-level array in a growing JSON document"""
+
+    def __init__(self, key: str):
+        """
+        Args:
+            key: Name of the top-level array to emit, e.g. 'discrepancies'
+        """
+        self.key = key
+        self.text = ""
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._awaiting_array = False
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Add the next piece of text.
+
+        Returns:
+            Array elements completed by this chunk, in order
+        """
+        items = []
+        start = len(self.text)
+        self.text += chunk
+        text = self.text
+        for i in range(start, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._array_depth is None:
+                        self._last_string = text[self._string_start + 1:i]
+                continue
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch == ":":
+                # A top-level key followed by ':' -- is it the array we want?
+                self._awaiting_array = self._depth == 1 and self._last_string == self.key
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "[" and self._awaiting_array:
+                    self._array_depth = self._depth
+                elif ch == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._item_start = i
+                self._awaiting_array = False
+            elif ch in "}]":
+                if ch == "}" and self._item_start is not None and self._depth == self._array_depth + 1:
+                    try:
+                        items.append(json.loads(text[self._item_start:i + 1]))
+                    except ValueError:
+                        pass
+                    self._item_start = None
+                elif ch == "]" and self._depth == self._array_depth:
+                    self._array_depth = None
+                self._depth -= 1
+            elif not ch.isspace():
+                self._awaiting_array = False
+        return items
+
+    def document(self) -> Optional[Any]:
+        """Parse everything received so far as one JSON document (fences stripped)."""
+        text = self.text.replace('```json', '').replace('```', '').strip()
+        try:
+            return json.loads(text)
+        except ValueError:
+            return None
@@ -0,0 +1,248 @@
+"""
+Shared Gemini client for every AI function.
+Coordinates all calls through a process-wide token bucket and retries
+quota errors with jittered exponential backoff.
+"""
+
+from typing import Dict, Any, Iterator, List, Optional
+import json
+import random
+import threading
+import time
+import google.generativeai as genai
+from app.core.config import settings
+from app.services.rate_limits import is_rate_limit_error
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) used for budgeting."""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """Thread-safe request and token budget refilled continuously per minute"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        """
+        Args:
+            requests_per_minute: Request quota; 0 disables the request limit
+            tokens_per_minute: Token quota; 0 disables the token limit
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(
+                float(self.requests_per_minute),
+                self._requests + elapsed * self.requests_per_minute / 60.0
+            )
+        if self.tokens_per_minute:
+            self._tokens = min(
+                float(self.tokens_per_minute),
+                self._tokens + elapsed * self.tokens_per_minute / 60.0
+            )
+
+    def _wait_time(self, tokens: int) -> float:
+        wait = 0.0
+        if self.requests_per_minute and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60.0 / self.requests_per_minute)
+        if self.tokens_per_minute and self._tokens < tokens:
+            wait = max(wait, (tokens - self._tokens) * 60.0 / self.tokens_per_minute)
+        return wait
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        Block until one request and `tokens` tokens are available.
+
+        Args:
+            tokens: Estimated tokens the call will consume
+
+        Returns:
+            Seconds spent waiting for budget
+        """
+        if self.tokens_per_minute:
+            # A single oversized call may never exceed the whole bucket
+            tokens = min(tokens, self.tokens_per_minute)
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                self._refill()
+                wait = self._wait_time(tokens)
+                if wait <= 0:
+                    break
+                self._cond.wait(timeout=wait)
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+        return time.monotonic() - started
+
+    def drain(self) -> None:
+        """Empty the bucket after the server reports quota exhaustion."""
+        with self._cond:
+            self._refill()
+            self._requests = min(self._requests, 0.0)
+            self._tokens = min(self._tokens, 0.0)
+
+
+class GeminiClient:
+    """Long-lived Gemini model wrapper with rate limiting, retries and metrics"""
+
+    def __init__(self, model_name: str, bucket: TokenBucket):
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self.bucket = bucket
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "total_latency_ms": 0.0,
+            "last_latency_ms": 0.0,
+            "total_wait_ms": 0.0,
+        }
+
+    def _record(self, **increments: float) -> None:
+        with self._lock:
+            for key, value in increments.items():
+                self._stats[key] += value
+
+    def _call(self, tokens: int, func):
+        attempt = 0
+        self._record(calls=1)
+        while True:
+            waited = self.bucket.acquire(tokens)
+            started = time.perf_counter()
+            try:
+                response = func()
+                latency_ms = (time.perf_counter() - started) * 1000
+                self._record(successes=1, total_wait_ms=waited * 1000)
+                with self._lock:
+                    self._stats["total_latency_ms"] += latency_ms
+                    self._stats["last_latency_ms"] = latency_ms
+                return response
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= settings.gemini_max_retries:
+                    self._record(failures=1)
+                    raise
+                self.bucket.drain()
+                delay = min(
+                    settings.gemini_backoff_max,
+                    settings.gemini_backoff_base * (2 ** attempt)
+                )
+                attempt += 1
+                self._record(retries=1, rate_limited=1)
+                time.sleep(random.uniform(delay / 2, delay))
+
+    def generate(self, prompt: str, **kwargs):
+        """
+        Call generate_content under the shared budget, retrying quota errors.
+
+        Args:
+            prompt: Prompt text sent to the model
+            **kwargs: Extra arguments forwarded to generate_content
+
+        Returns:
+            The Gemini response object
+        """
+        return self._call(_estimate_tokens(prompt), lambda: self.model.generate_content(prompt, **kwargs))
+
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """
+        Stream generate_content under the shared budget.
+        Quota errors are retried only while opening the stream; once text
+        has been yielded a failure is raised to the caller.
+
+        Yields:
+            Response text as the model produces it
+        """
+        response = self._call(
+            _estimate_tokens(prompt),
+            lambda: self.model.generate_content(prompt, stream=True, **kwargs)
+        )
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without parts (finish or safety metadata only) raise on .text
+                continue
+            if text:
+                yield text
+
+    def embed(self, texts: List[str], model: str, task_type: str = "retrieval_document") -> List[List[float]]:
+        """
+        Embed texts in one embed_content call under the shared budget.
+
+        Args:
+            texts: Texts to embed
+            model: Embedding model, e.g. models/text-embedding-004
+            task_type: retrieval_document for stored texts, retrieval_query for queries
+
+        Returns:
+            One embedding per text, in order
+        """
+        tokens = sum(_estimate_tokens(text) for text in texts)
+        result = self._call(tokens, lambda: genai.embed_content(model=model, content=texts, task_type=task_type))
+        return result["embedding"]
+
+    def generate_json(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """
+        Generate a response and parse it as JSON.
+
+        Args:
+            prompt: Prompt asking the model for a JSON document
+
+        Returns:
+            Parsed JSON dictionary, or None if the call or parsing failed
+        """
+        try:
+            response = self.generate(prompt)
+
+            # Clean up the response text to ensure it's valid JSON
+            text = response.text.replace('```json', '').replace('```', '').strip()
+
+            return json.loads(text)
+        except Exception as e:
+            print(f"Error calling Gemini: {e}")
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of call, retry and latency counters."""
+        with self._lock:
+            snapshot = dict(self._stats)
+        successes = snapshot["successes"]
+        snapshot["avg_latency_ms"] = snapshot["total_latency_ms"] / successes if successes else 0.0
+        snapshot["model"] = self.model_name
+        return snapshot
+
+
+_client: Optional[GeminiClient] = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> GeminiClient:
+    """Return the process-wide Gemini client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if settings.gemini_api_key:
+                    genai.configure(api_key=settings.gemini_api_key)
+                else:
+                    print("Warning: GEMINI_API_KEY not found in settings")
+                bucket = TokenBucket(
+                    settings.gemini_requests_per_minute,
+                    settings.gemini_tokens_per_minute
+                )
+                _client = GeminiClient(settings.gemini_model, bucket)
+    return _client
@@ -0,0 +1,56 @@
+"""
+Local OCR with Tesseract.
+Runs in worker processes, so this module deliberately imports nothing
+from the rest of the app.
+"""
+
+from typing import Dict, Any
+import io
+
+try:
+    import pytesseract
+    from PIL import Image
+except ImportError:
+    pytesseract = None
+
+
+def tesseract_available() -> bool:
+    """Return True if pytesseract and the tesseract binary can be used."""
+    if pytesseract is None:
+        return False
+    try:
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def tesseract_ocr(image_bytes: bytes, lang: str) -> Dict[str, Any]:
+    """
+    Recognize text in an image with Tesseract.
+
+    Args:
+        image_bytes: Encoded image
+        lang: Tesseract language codes, e.g. 'eng+hin'
+
+    Returns:
+        Dictionary with the text (one line per detected line) and the mean
+        word confidence in the range 0-1
+    """
+    image = Image.open(io.BytesIO(image_bytes))
+    data = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+
+    lines: Dict[tuple, list] = {}
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        confidence = float(data["conf"][i])
+        if not word.strip() or confidence < 0:
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+        confidences.append(confidence)
+
+    return {
+        "text": "\n".join(" ".join(words) for _, words in sorted(lines.items())),
+        "confidence": sum(confidences) / len(confidences) / 100 if confidences else 0.0
+    }
@@ -0,0 +1,169 @@
+"""
+Merkle batching for evidence anchoring.
+Evidence digests collected over a short window are hashed into one Merkle
+tree and only the root goes on chain. Pairs are hashed in sorted order
+(keccak256 of the smaller node then the larger), matching
+EvidenceVault.verifyLeaf, so a proof is just the list of sibling hashes.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from eth_utils import keccak
+
+
+def leaf_hash(digest: bytes) -> bytes:
+    """Hash an evidence digest into a leaf (32-byte preimage, unlike inner nodes)."""
+    return keccak(digest)
+
+
+def _hash_pair(a: bytes, b: bytes) -> bytes:
+    return keccak(a + b) if a < b else keccak(b + a)
+
+
+def build_tree(leaves: List[bytes]) -> List[List[bytes]]:
+    """
+    Build every level of a Merkle tree.
+
+    Args:
+        leaves: Leaf hashes in submission order
+
+    Returns:
+        Levels from the leaves up to the single root; an odd node at the end
+        of a level is carried up unchanged
+    """
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [_hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_proof(levels: List[List[bytes]], index: int) -> List[bytes]:
+    """Return the sibling hashes proving the leaf at index, bottom-up."""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: bytes, proof: List[bytes], root: bytes) -> bool:
+    """Check that leaf and its proof hash up to root."""
+    node = leaf
+    for sibling in proof:
+        node = _hash_pair(node, sibling)
+    return node == root
+
+
+class MerkleBatcher:
+    """
+    Collects evidence digests and anchors them one Merkle root at a time.
+    A batch closes when the window elapses after its first digest or when
+    it reaches max_leaves; each caller's future resolves to its leaf index,
+    proof and the result of submitting the root.
+    """
+
+    def __init__(
+        self,
+        submit_root: Callable[[bytes, int], Dict[str, Any]],
+        window_seconds: float,
+        max_leaves: int
+    ):
+        """
+        Args:
+            submit_root: Anchors (root, leaf_count) on chain and returns a
+                dictionary with at least 'tx_hash'
+            window_seconds: How long a batch stays open after its first digest
+            max_leaves: Batch size that closes the window early
+        """
+        self.submit_root = submit_root
+        self.window = window_seconds
+        self.max_leaves = max_leaves
+        self._queue: "queue.Queue[Tuple[bytes, Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {"leaves": 0, "batches": 0, "errors": 0}
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._collect, name="merkle-batcher", daemon=True)
+                    self._thread.start()
+
+    def add(self, digest: bytes) -> Future:
+        """
+        Queue a 32-byte evidence digest for the next anchored root.
+
+        Returns:
+            Future resolving to a dictionary with root, leaf, leaf_index,
+            leaf_count, proof (all hex) and the submit_root result
+        """
+        if len(digest) != 32:
+            raise ValueError("Evidence digest must be 32 bytes")
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((digest, future))
+        return future
+
+    def _collect(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_leaves:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._anchor(batch)
+
+    def _anchor(self, batch: List[Tuple[bytes, Future]]) -> None:
+        # A digest queued twice in one window is one leaf; both callers get its proof
+        positions: Dict[bytes, int] = {}
+        for digest, _ in batch:
+            positions.setdefault(digest, len(positions))
+        leaves = [leaf_hash(digest) for digest in positions]
+        try:
+            levels = build_tree(leaves)
+            root = levels[-1][0]
+            receipt = self.submit_root(root, len(leaves))
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self._stats["leaves"] += len(leaves)
+            self._stats["batches"] += 1
+        for digest, future in batch:
+            index = positions[digest]
+            future.set_result({
+                **receipt,
+                "digest": "0x" + digest.hex(),
+                "root": "0x" + root.hex(),
+                "leaf": "0x" + leaves[index].hex(),
+                "leaf_index": index,
+                "leaf_count": len(leaves),
+                "proof": ["0x" + node.hex() for node in merkle_proof(levels, index)]
+            })
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot["avg_batch_size"] = snapshot["leaves"] / snapshot["batches"] if snapshot["batches"] else 0.0
+        return snapshot
@@ -1,58 +1,279 @@
 """
 OCR Service for extracting text from images and PDFs.
-Uses Google Cloud Vision API for optical character recognition.
+Routes images to Google Cloud Vision or a local Tesseract engine
+(see ocr_backends) for optical character recognition.
 """
 
-from typing import Union, Dict, Any
+from typing import BinaryIO, Callable, Union, Dict, Any, Iterator, Optional, Tuple
+from collections import deque
+import hashlib
 import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from app.core.config import settings
+from app.core.concurrency import get_process_pool
+from app.services.cache import SingleFlight, get_cache, make_cache_key
+from app.services.image_preprocess import preprocess_image
+from app.services.ocr_backends import get_backend_stats, ocr_available, recognize_image
 
 try:
-    from google.cloud import vision
+    import fitz  # PyMuPDF
 except ImportError:
-    vision = None
+    fitz = None
 
+# Bump whenever OCR output for the same bytes may change
+OCR_CACHE_VERSION = "ocr-v1"
 
-def extract_text_from_image(image_bytes: bytes) -> str:
+_ocr_flights = SingleFlight()
+
+_preprocess_lock = threading.Lock()
+_preprocess_stats = {"images": 0, "bytes_in": 0, "bytes_out": 0, "elapsed_ms": 0.0, "failures": 0}
+
+
+def prepare_image(image_bytes: bytes) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Shrink an image before OCR in a worker process.
+    
+    Args:
+        image_bytes: Raw uploaded image
+        
+    Returns:
+        Tuple of (bytes to send to OCR, per-image stats including bytes
+        saved and time spent)
+    """
+    if not settings.ocr_preprocess_enabled:
+        return image_bytes, {"applied": False}
+    try:
+        prepared, info = get_process_pool().submit(
+            preprocess_image,
+            image_bytes,
+            settings.ocr_target_dpi,
+            settings.ocr_jpeg_quality,
+            settings.ocr_margin_threshold
+        ).result()
+    except Exception as e:
+        # Formats Pillow cannot decode are sent to OCR untouched
+        with _preprocess_lock:
+            _preprocess_stats["failures"] += 1
+        return image_bytes, {"applied": False, "message": str(e)}
+    
+    with _preprocess_lock:
+        _preprocess_stats["images"] += 1
+        _preprocess_stats["bytes_in"] += info["original_bytes"]
+        _preprocess_stats["bytes_out"] += info["output_bytes"]
+        _preprocess_stats["elapsed_ms"] += info["elapsed_ms"]
+    return prepared, info
+
+
+def get_ocr_stats() -> Dict[str, Any]:
+    """Return OCR counters for the stats endpoint."""
+    with _preprocess_lock:
+        preprocessing = dict(_preprocess_stats)
+    preprocessing["bytes_saved"] = preprocessing["bytes_in"] - preprocessing["bytes_out"]
+    stats = get_backend_stats()
+    stats.update({
+        "deduplicated_calls": _ocr_flights.shared,
+        "preprocessing": preprocessing
+    })
+    return stats
+
+
+def _ocr_cache():
+    return get_cache(
+        "ocr",
+        memory_entries=settings.ocr_cache_memory_entries,
+        ttl_seconds=settings.ocr_cache_ttl_seconds,
+        max_disk_bytes=settings.ocr_cache_max_disk_mb * 1024 * 1024
+    )
+
+
+def _ocr_cache_key(*parts: str) -> str:
+    return make_cache_key([OCR_CACHE_VERSION, settings.ocr_backend, *parts])
+
+
+def _cached_ocr(key: str, compute: Callable[[], str]) -> str:
+    """
+    Return cached OCR text for key, computing it at most once at a time.
+    Concurrent requests for the same key wait on the in-flight call.
+    """
+    cached = _ocr_cache().get(key)
+    if cached is not None:
+        return cached
+
+    def run() -> str:
+        # A flight for this key may have finished since the lookup above
+        cached = _ocr_cache().get(key)
+        if cached is not None:
+            return cached
+        result = compute()
+        _ocr_cache().set(key, result)
+        return result
+
+    return _ocr_flights.do(key, run)
+
+
+def _read_content(content: Union[bytes, BinaryIO]) -> bytes:
+    """Return raw bytes from either bytes or a readable file object."""
+    if isinstance(content, (bytes, bytearray)):
+        return bytes(content)
+    content.seek(0)
+    return content.read()
+
+
+def _ocr_image(image_bytes: bytes, preprocess: bool = True) -> str:
+    if preprocess:
+        image_bytes, _ = prepare_image(image_bytes)
+    return recognize_image(image_bytes)["text"]
+
+
+def extract_text_from_image(image_bytes: bytes, content_hash: Optional[str] = None) -> str:
     """
-    Extract text from an image file using Google Vision API.
+    Extract text from an image file using the configured OCR backends.
+    Results are cached by the SHA-256 of the image bytes.
     
     Args:
         image_bytes: Binary content of the image file
+        content_hash: SHA-256 hex digest of image_bytes, if already known
         
     Returns:
         Extracted text from the image
     """
     try:
-        if vision is None:
-            return "Text extracted from image (Google Cloud Vision not installed)"
+        if not ocr_available():
+            return "Text extracted from image (no OCR backend installed)"
         
-        client = vision.ImageAnnotatorClient()
-        image = vision.Image(content=image_bytes)
-        response = client.text_detection(image=image)
-        texts = response.text_annotations
-        
-        if texts:
-            return texts[0].description
-        return ""
+        content_hash = content_hash or hashlib.sha256(image_bytes).hexdigest()
+        return _cached_ocr(_ocr_cache_key("image", content_hash), lambda: _ocr_image(image_bytes))
     except Exception as e:
         raise Exception(f"OCR Error: {str(e)}")
 
 
-def extract_text_from_pdf(file_content: bytes) -> str:
+_pdf_executor: Optional[ThreadPoolExecutor] = None
+_pdf_executor_lock = threading.Lock()
+
+
+def _get_pdf_executor() -> ThreadPoolExecutor:
+    global _pdf_executor
+    if _pdf_executor is None:
+        with _pdf_executor_lock:
+            if _pdf_executor is None:
+                _pdf_executor = ThreadPoolExecutor(
+                    max_workers=settings.pdf_ocr_workers,
+                    thread_name_prefix="pdf-ocr"
+                )
+    return _pdf_executor
+
+
+def iter_pdf_pages(
+    file_content: Union[bytes, BinaryIO],
+    rasterize: Optional[Callable[[int], bool]] = None
+) -> Iterator[Tuple[int, Optional[str], Optional[bytes]]]:
+    """
+    Lazily walk a PDF one page at a time.
+
+    Pages with an embedded text layer yield their text; image-only pages
+    are rasterized only when reached, so at most one page image is
+    produced per step of the iteration.
+    
+    Args:
+        file_content: Binary content of the PDF file, or a file object
+        rasterize: Called with the page number of an image-only page;
+            returning False skips rendering it (e.g. OCR text is cached)
+        
+    Yields:
+        (page_number, text, png_bytes); both are None for skipped pages
+    """
+    document = fitz.open(stream=_read_content(file_content), filetype="pdf")
+    try:
+        for index, page in enumerate(document):
+            text = page.get_text("text").strip()
+            if len(text) >= settings.pdf_min_text_chars:
+                yield index + 1, text, None
+            elif rasterize is not None and not rasterize(index + 1):
+                yield index + 1, None, None
+            else:
+                pixmap = page.get_pixmap(dpi=settings.pdf_ocr_dpi, colorspace=fitz.csGRAY)
+                yield index + 1, None, pixmap.tobytes("png")
+    finally:
+        document.close()
+
+
+def _extract_pdf(data: bytes, content_hash: str) -> str:
+    executor = _get_pdf_executor()
+    page_texts: Dict[int, str] = {}
+    in_flight: "deque[Tuple[int, Future]]" = deque()
+    cache = _ocr_cache()
+    can_ocr = ocr_available()
+    
+    def page_key(page_number: int) -> str:
+        return _ocr_cache_key("pdf-page", content_hash, str(page_number), str(settings.pdf_ocr_dpi))
+    
+    def rasterize(page_number: int) -> bool:
+        cached = cache.get(page_key(page_number))
+        if cached is not None:
+            page_texts[page_number] = cached
+            return False
+        if not can_ocr:
+            # Neither rendered nor cached; the text-layer pages still come through
+            page_texts[page_number] = "Text extracted from PDF page (no OCR backend installed)"
+            return False
+        return True
+    
+    for page_number, text, image in iter_pdf_pages(data, rasterize):
+        if text is not None:
+            page_texts[page_number] = text
+            continue
+        if image is None:
+            continue
+        in_flight.append((
+            page_number,
+            # Rendered pages are already grayscale at the target DPI
+            executor.submit(_cached_ocr, page_key(page_number), partial(_ocr_image, image, False))
+        ))
+        del image
+        # Wait for the oldest page before rasterizing more than the cap
+        while len(in_flight) >= settings.pdf_max_inflight_pages:
+            done_page, future = in_flight.popleft()
+            page_texts[done_page] = future.result()
+    
+    while in_flight:
+        done_page, future = in_flight.popleft()
+        page_texts[done_page] = future.result()
+    
+    return "\n\n".join(
+        f"--- Page {page_number} ---\n{page_texts[page_number]}"
+        for page_number in sorted(page_texts)
+    )
+
+
+def extract_text_from_pdf(file_content: Union[bytes, BinaryIO], content_hash: Optional[str] = None) -> str:
     """
     Extract text from a PDF file.
+    Uses the embedded text layer where present and OCRs image-only pages
+    in parallel, keeping a bounded number of rasterized pages in flight.
+    Whole documents and individual OCR'd pages are cached by content hash.
     
     Args:
-        file_content: Binary content of the PDF file
+        file_content: Binary content of the PDF file, or a file object
+        content_hash: SHA-256 hex digest of the PDF bytes, if already known
         
     Returns:
-        Extracted text from the PDF
+        Extracted text from the PDF with '--- Page X ---' markers
     """
     try:
-        # TODO: Implement PDF text extraction using pdfplumber or PyPDF2
-        # Could use OCR for scanned PDFs
-        return "Text extracted from PDF (placeholder)"
+        if fitz is None:
+            return "Text extracted from PDF (PyMuPDF not installed)"
+        
+        data = _read_content(file_content)
+        content_hash = content_hash or hashlib.sha256(data).hexdigest()
+        if not ocr_available():
+            # Placeholder OCR output must not be cached
+            return _extract_pdf(data, content_hash)
+        return _cached_ocr(
+            _ocr_cache_key("pdf", content_hash, str(settings.pdf_ocr_dpi), str(settings.pdf_min_text_chars)),
+            lambda: _extract_pdf(data, content_hash)
+        )
     except Exception as e:
         raise Exception(f"PDF Extraction Error: {str(e)}")
 
@@ -68,21 +289,22 @@ def detect_text_in_image(image_bytes: bytes) -> Dict[str, Any]:
         Dictionary containing detected text and metadata
     """
     try:
-        if vision is None:
+        if not ocr_available():
             return {
                 "status": "error",
-                "message": "Google Cloud Vision not installed"
+                "message": "No OCR backend installed"
             }
         
-        client = vision.ImageAnnotatorClient()
-        image = vision.Image(content=image_bytes)
-        response = client.text_detection(image=image)
+        prepared, preprocessing = prepare_image(image_bytes)
+        result = recognize_image(prepared)
         
         return {
             "status": "success",
-            "text": response.text_annotations[0].description if response.text_annotations else "",
-            "confidence": 0.95,
-            "language": "en"
+            "text": result["text"],
+            "confidence": result["confidence"],
+            "backend": result["backend"],
+            "language": "en",
+            "preprocessing": preprocessing
         }
     except Exception as e:
         return {
@@ -91,20 +313,26 @@ def detect_text_in_image(image_bytes: bytes) -> Dict[str, Any]:
         }
 
 
-def process_document(file_content: bytes, file_type: str) -> str:
+def process_document(
+    file_content: Union[bytes, BinaryIO],
+    file_type: str,
+    content_hash: Optional[str] = None
+) -> str:
     """
     Process a document based on its file type (image or PDF).
     
     Args:
-        file_content: Binary content of the file
+        file_content: Binary content of the file, or a file object such as
+            a spooled upload (read only when the backend needs the bytes)
         file_type: Type of file ('image' or 'pdf')
+        content_hash: SHA-256 hex digest of the content, if already known
         
     Returns:
         Extracted text from the document
     """
     if file_type == "image":
-        return extract_text_from_image(file_content)
+        return extract_text_from_image(_read_content(file_content), content_hash)
     elif file_type == "pdf":
-        return extract_text_from_pdf(file_content)
+        return extract_text_from_pdf(file_content, content_hash)
     else:
         raise ValueError(f"Unsupported file type: {file_type}")
@@ -0,0 +1,270 @@
+"""
+Pluggable OCR backends.
+Google Vision runs in the cloud through a shared micro-batching client;
+Tesseract runs locally in a process pool sized to the machine. A router
+tries the local engine first and only falls back to the cloud when the
+local result has low confidence.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+from abc import ABC, abstractmethod
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from app.core.config import settings
+from app.core.concurrency import get_process_pool
+from app.services.local_ocr import tesseract_available, tesseract_ocr
+
+try:
+    from google.cloud import vision
+except ImportError:
+    vision = None
+
+_vision_client = None
+_vision_client_lock = threading.Lock()
+
+
+def get_vision_client():
+    """Return the process-wide Vision client (one gRPC channel per process)."""
+    global _vision_client
+    if _vision_client is None:
+        with _vision_client_lock:
+            if _vision_client is None:
+                _vision_client = vision.ImageAnnotatorClient()
+    return _vision_client
+
+
+class VisionBatcher:
+    """
+    Micro-batcher for Vision text detection.
+    Images submitted by concurrent callers within a short window are sent
+    together as one batch_annotate_images call and the responses fanned out.
+    """
+
+    def __init__(self, max_batch: int, window_ms: float, max_batch_bytes: int, max_inflight: int):
+        self.max_batch = max_batch
+        self.window = window_ms / 1000.0
+        self.max_batch_bytes = max_batch_bytes
+        self._queue: "queue.Queue[Tuple[bytes, Future]]" = queue.Queue()
+        self._senders = ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix="vision-batch")
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {"images": 0, "batches": 0, "errors": 0}
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._collect, name="vision-batcher", daemon=True)
+                    self._thread.start()
+
+    def annotate(self, image_bytes: bytes):
+        """
+        Run text detection on one image as part of the next batch.
+
+        Args:
+            image_bytes: Binary content of the image file
+
+        Returns:
+            The AnnotateImageResponse for this image
+        """
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((image_bytes, future))
+        return future.result()
+
+    def _collect(self) -> None:
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            batch_bytes = len(first[0])
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if batch_bytes + len(item[0]) > self.max_batch_bytes:
+                    # Request payload is capped; start the next batch with it
+                    self._senders.submit(self._send, batch)
+                    batch, batch_bytes = [], 0
+                    deadline = time.monotonic() + self.window
+                batch.append(item)
+                batch_bytes += len(item[0])
+            self._senders.submit(self._send, batch)
+
+    def _send(self, batch: List[Tuple[bytes, Future]]) -> None:
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["images"] += len(batch)
+        try:
+            feature = vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)
+            requests = [
+                vision.AnnotateImageRequest(image=vision.Image(content=content), features=[feature])
+                for content, _ in batch
+            ]
+            response = get_vision_client().batch_annotate_images(requests=requests)
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, response.responses):
+            if result.error.message:
+                future.set_exception(Exception(result.error.message))
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return image and batch counters."""
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot["avg_batch_size"] = snapshot["images"] / snapshot["batches"] if snapshot["batches"] else 0.0
+        return snapshot
+
+
+_batcher: Optional[VisionBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_vision_batcher() -> VisionBatcher:
+    """Return the shared Vision micro-batcher, creating it on first use."""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = VisionBatcher(
+                    max_batch=settings.vision_batch_size,
+                    window_ms=settings.vision_batch_window_ms,
+                    max_batch_bytes=settings.vision_batch_max_bytes,
+                    max_inflight=settings.vision_max_inflight_batches
+                )
+    return _batcher
+
+
+
+class OCRBackend(ABC):
+    """Interface every OCR engine implements"""
+
+    name = "base"
+
+    @abstractmethod
+    def available(self) -> bool:
+        """Return True if the engine can be used in this deployment."""
+
+    @abstractmethod
+    def recognize(self, image_bytes: bytes) -> Dict[str, Any]:
+        """
+        Recognize text in one image.
+
+        Args:
+            image_bytes: Encoded image
+
+        Returns:
+            Dictionary with 'text', 'confidence' (0-1) and 'backend'
+        """
+
+
+class VisionBackend(OCRBackend):
+    """Google Cloud Vision text detection through the shared batcher"""
+
+    name = "vision"
+
+    def available(self) -> bool:
+        return vision is not None
+
+    def recognize(self, image_bytes: bytes) -> Dict[str, Any]:
+        response = get_vision_batcher().annotate(image_bytes)
+        texts = response.text_annotations
+        pages = response.full_text_annotation.pages if response.full_text_annotation else []
+        confidences = [block.confidence for page in pages for block in page.blocks]
+        return {
+            "text": texts[0].description if texts else "",
+            "confidence": sum(confidences) / len(confidences) if confidences else 0.95,
+            "backend": self.name
+        }
+
+
+class TesseractBackend(OCRBackend):
+    """Local Tesseract OCR in the shared process pool"""
+
+    name = "tesseract"
+
+    def __init__(self):
+        self._available: Optional[bool] = None
+
+    def available(self) -> bool:
+        if self._available is None:
+            self._available = tesseract_available()
+        return self._available
+
+    def recognize(self, image_bytes: bytes) -> Dict[str, Any]:
+        result = get_process_pool().submit(tesseract_ocr, image_bytes, settings.tesseract_lang).result()
+        result["backend"] = self.name
+        return result
+
+
+_backends = {
+    "vision": VisionBackend(),
+    "tesseract": TesseractBackend(),
+}
+_route_lock = threading.Lock()
+_route_stats = {"local": 0, "cloud": 0, "cloud_fallbacks": 0}
+
+
+def _count(key: str) -> None:
+    with _route_lock:
+        _route_stats[key] += 1
+
+
+def ocr_available() -> bool:
+    """Return True if the configured routing has at least one usable engine."""
+    if settings.ocr_backend == "auto":
+        return any(backend.available() for backend in _backends.values())
+    return _backends[settings.ocr_backend].available()
+
+
+def recognize_image(image_bytes: bytes) -> Dict[str, Any]:
+    """
+    Route one image to an OCR engine.
+
+    With ocr_backend='auto' the local engine runs first and Vision is only
+    called when the local confidence is below ocr_min_local_confidence.
+    
+    Args:
+        image_bytes: Encoded image
+        
+    Returns:
+        Dictionary with 'text', 'confidence' and the 'backend' that produced it
+    """
+    if settings.ocr_backend != "auto":
+        backend = _backends[settings.ocr_backend]
+        _count("local" if backend.name == "tesseract" else "cloud")
+        return backend.recognize(image_bytes)
+
+    local, cloud = _backends["tesseract"], _backends["vision"]
+    if local.available():
+        _count("local")
+        result = local.recognize(image_bytes)
+        if result["confidence"] >= settings.ocr_min_local_confidence or not cloud.available():
+            return result
+        _count("cloud_fallbacks")
+    _count("cloud")
+    return cloud.recognize(image_bytes)
+
+
+def get_backend_stats() -> Dict[str, Any]:
+    """Return routing and Vision batching counters."""
+    with _route_lock:
+        routing = dict(_route_stats)
+    return {
+        "backend": settings.ocr_backend,
+        "routing": routing,
+        "vision_batches": _batcher.stats() if _batcher is not None else {}
+    }
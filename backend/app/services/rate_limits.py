@@ -0,0 +1,14 @@
+"""
+Quota error detection shared by the Gemini client and bulk ingestion.
+Kept free of the Gemini SDK so local-only code paths can import it.
+"""
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for quota errors (HTTP 429 / RESOURCE_EXHAUSTED) from any client."""
+    message = str(error)
+    return (
+        "429" in message
+        or "RESOURCE_EXHAUSTED" in message
+        or type(error).__name__ in ("ResourceExhausted", "TooManyRequests")
+    )
@@ -0,0 +1,265 @@
+"""
+Background transaction submission.
+Contract calls are queued, signed with locally assigned nonces and sent
+without waiting for earlier ones to be mined, so many transactions can be
+pipelined from one key. A single worker thread sends new transactions,
+re-broadcasts stuck ones with a higher gas price and tracks receipts
+until the configured number of confirmations.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+import itertools
+import queue
+import threading
+import time
+import uuid
+from app.core.config import settings
+
+
+class NonceManager:
+    """Hands out consecutive nonces for one account without RPC round-trips"""
+
+    def __init__(self, w3, address: str):
+        self.w3 = w3
+        self.address = address
+        self._next: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        with self._lock:
+            if self._next is None:
+                self._next = self.w3.eth.get_transaction_count(self.address, "pending")
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def resync(self) -> None:
+        """Forget the local counter; the next nonce is read from the node."""
+        with self._lock:
+            self._next = None
+
+
+class TxJob:
+    """One queued contract call and everything known about its transaction"""
+
+    def __init__(self, function_call):
+        self.id = uuid.uuid4().hex
+        self.function_call = function_call
+        self.status = "queued"
+        self.tx: Optional[Dict[str, Any]] = None
+        self.nonce: Optional[int] = None
+        self.tx_hashes: List[str] = []
+        self.sent_at: Optional[float] = None
+        self.bumps = 0
+        self.block_number: Optional[int] = None
+        self.confirmations = 0
+        self.error: Optional[str] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "tx_id": self.id,
+            "status": self.status,
+            # The latest broadcast is the one expected to be mined
+            "tx_hash": self.tx_hashes[-1] if self.tx_hashes else None,
+            "nonce": self.nonce,
+            "gas_price": self.tx["gasPrice"] if self.tx else None,
+            "gas_bumps": self.bumps,
+            "block_number": self.block_number,
+            "confirmations": self.confirmations,
+            "error": self.error
+        }
+
+
+class TransactionQueue:
+    """Pipelined sender with gas bumping and confirmation tracking"""
+
+    def __init__(self, w3, account, on_settled: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Args:
+            w3: Connected Web3 instance
+            account: eth_account LocalAccount that signs every transaction
+            on_settled: Called with a job snapshot once it is confirmed or
+                its transaction reverted
+        """
+        self.w3 = w3
+        self.account = account
+        self.on_settled = on_settled
+        self.nonces = NonceManager(w3, account.address)
+        self._queue: "queue.Queue[TxJob]" = queue.Queue()
+        self._jobs: Dict[str, TxJob] = {}
+        self._in_flight: List[TxJob] = []
+        self._lock = threading.Lock()
+        self._chain_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stats = {"submitted": 0, "sent": 0, "bumped": 0, "confirmed": 0, "failed": 0}
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="tx-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def submit(self, function_call) -> TxJob:
+        """
+        Queue a bound contract call, e.g. contract.functions.anchorRoot(...).
+
+        Returns:
+            The job, whose status moves through queued, pending, mined and
+            confirmed (or failed)
+        """
+        job = TxJob(function_call)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._stats["submitted"] += 1
+            # Forget the oldest finished jobs beyond the retention cap
+            if len(self._jobs) > settings.tx_jobs_max:
+                finished = [
+                    job_id for job_id, old in itertools.islice(self._jobs.items(), len(self._jobs) - settings.tx_jobs_max)
+                    if old.status in ("confirmed", "failed")
+                ]
+                for job_id in finished:
+                    del self._jobs[job_id]
+        self.start()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a snapshot of a job, or None if it is unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job is not None else None
+
+    def _run(self) -> None:
+        last_poll = 0.0
+        while not self._stop.is_set():
+            try:
+                job = self._queue.get(timeout=settings.tx_poll_interval_seconds)
+                self._send(job)
+            except queue.Empty:
+                pass
+            except Exception as e:
+                print(f"Transaction send failed: {e}")
+            # Keep sending back-to-back while jobs are waiting, polling on schedule
+            if time.monotonic() - last_poll >= settings.tx_poll_interval_seconds:
+                last_poll = time.monotonic()
+                try:
+                    self._poll()
+                except Exception as e:
+                    print(f"Transaction poll failed: {e}")
+
+    def _fail(self, job: TxJob, error: Exception) -> None:
+        with self._lock:
+            job.status = "failed"
+            job.error = str(error)
+            self._stats["failed"] += 1
+
+    def _broadcast(self, job: TxJob) -> None:
+        signed = self.account.sign_transaction(job.tx)
+        try:
+            tx_hash = self.w3.eth.send_raw_transaction(signed.rawTransaction).hex()
+        except ValueError as e:
+            # The node already has this exact transaction
+            if "already known" not in str(e):
+                raise
+            tx_hash = signed.hash.hex()
+        with self._lock:
+            job.tx_hashes.append(tx_hash)
+            job.sent_at = time.monotonic()
+            job.status = "pending"
+
+    def _send(self, job: TxJob) -> None:
+        try:
+            if self._chain_id is None:
+                self._chain_id = self.w3.eth.chain_id
+            job.nonce = self.nonces.next()
+            job.tx = job.function_call.build_transaction({
+                "from": self.account.address,
+                "nonce": job.nonce,
+                "gasPrice": self.w3.eth.gas_price,
+                "chainId": self._chain_id
+            })
+            self._broadcast(job)
+        except Exception as e:
+            # The nonce never reached the mempool; reread it so later jobs leave no gap
+            self.nonces.resync()
+            self._fail(job, e)
+            with self._lock:
+                snapshot = job.snapshot()
+            if self.on_settled is not None:
+                self.on_settled(snapshot)
+            return
+        with self._lock:
+            self._in_flight.append(job)
+            self._stats["sent"] += 1
+
+    def _bump(self, job: TxJob) -> None:
+        gas_price = int(job.tx["gasPrice"] * settings.tx_gas_bump_factor)
+        if gas_price > settings.tx_max_gas_price_gwei * 10 ** 9:
+            return
+        job.tx = {**job.tx, "gasPrice": gas_price}
+        try:
+            self._broadcast(job)
+        except Exception as e:
+            # Usually an earlier broadcast was mined in the meantime; receipts settle it
+            print(f"Gas bump for nonce {job.nonce} failed: {e}")
+            return
+        with self._lock:
+            job.bumps += 1
+            self._stats["bumped"] += 1
+
+    def _receipt(self, job: TxJob):
+        for tx_hash in reversed(job.tx_hashes):
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+            except Exception:
+                receipt = None
+            if receipt is not None:
+                return receipt
+        return None
+
+    def _poll(self) -> None:
+        with self._lock:
+            in_flight = list(self._in_flight)
+        if not in_flight:
+            return
+        latest = self.w3.eth.block_number
+        now = time.monotonic()
+        settled = set()
+        for job in in_flight:
+            if job.status == "pending":
+                receipt = self._receipt(job)
+                if receipt is None:
+                    if now - job.sent_at > settings.tx_stuck_after_seconds:
+                        self._bump(job)
+                    continue
+                if receipt.status == 0:
+                    self._fail(job, Exception(f"Transaction reverted in block {receipt.blockNumber}"))
+                    settled.add(job.id)
+                    continue
+                with self._lock:
+                    job.status = "mined"
+                    job.block_number = receipt.blockNumber
+            confirmations = latest - job.block_number + 1
+            with self._lock:
+                job.confirmations = max(confirmations, 0)
+                if confirmations >= settings.tx_confirmations:
+                    job.status = "confirmed"
+                    self._stats["confirmed"] += 1
+                    settled.add(job.id)
+        if settled:
+            with self._lock:
+                self._in_flight = [job for job in self._in_flight if job.id not in settled]
+                snapshots = [self._jobs[job_id].snapshot() for job_id in settled if job_id in self._jobs]
+            if self.on_settled is not None:
+                for snapshot in snapshots:
+                    self.on_settled(snapshot)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["in_flight"] = len(self._in_flight)
+        snapshot["queued"] = self._queue.qsize()
+        return snapshot
@@ -0,0 +1,90 @@
+"""
+Streaming upload handling.
+Copies uploaded files into spooled temporary files in fixed-size chunks,
+hashing them on the fly and enforcing per-file and per-request size caps.
+"""
+
+from typing import BinaryIO, Optional
+import hashlib
+import tempfile
+from fastapi import UploadFile
+from app.core.config import settings
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the configured byte limits"""
+
+
+class RequestBudget:
+    """Tracks the bytes remaining for all files of one request"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.remaining = max_bytes
+
+    def consume(self, size: int) -> None:
+        self.remaining -= size
+        if self.remaining < 0:
+            raise UploadTooLarge(f"Request exceeds the {self.max_bytes} byte upload limit")
+
+
+class SpooledUpload:
+    """An uploaded file held in a spooled temp file with its SHA-256 digest"""
+
+    def __init__(self, filename: str, content_type: Optional[str], file: BinaryIO, size: int, sha256: str):
+        self.filename = filename
+        self.content_type = content_type
+        self.file = file
+        self.size = size
+        self.sha256 = sha256
+
+    @property
+    def file_type(self) -> str:
+        return "pdf" if (self.filename or "").lower().endswith(".pdf") else "image"
+
+    def open(self) -> BinaryIO:
+        """Rewind and return the spooled file for reading."""
+        self.file.seek(0)
+        return self.file
+
+    def close(self) -> None:
+        self.file.close()
+
+
+async def spool_upload(upload: UploadFile, budget: Optional[RequestBudget] = None) -> SpooledUpload:
+    """
+    Stream an upload into a spooled temp file, hashing it as it arrives.
+
+    Args:
+        upload: Incoming FastAPI upload
+        budget: Shared byte budget for the whole request, if any
+
+    Returns:
+        SpooledUpload positioned at the start of the data
+
+    Raises:
+        UploadTooLarge: If the file or the request exceeds its byte cap
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=settings.upload_spool_memory_bytes)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(settings.upload_chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > settings.max_upload_file_bytes:
+                raise UploadTooLarge(
+                    f"{upload.filename} exceeds the {settings.max_upload_file_bytes} byte file limit"
+                )
+            if budget is not None:
+                budget.consume(len(chunk))
+            digest.update(chunk)
+            spooled.write(chunk)
+    except Exception:
+        spooled.close()
+        raise
+
+    spooled.seek(0)
+    return SpooledUpload(upload.filename, upload.content_type, spooled, size, digest.hexdigest())
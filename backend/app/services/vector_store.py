@@ -0,0 +1,142 @@
+"""
+Dense-vector store for IPC sections backed by NumPy.
+Normalized embeddings live in <collection>.npy, memory-mapped on open, with
+ids, texts and metadata in a <collection>.json sidecar. Queries are one
+matrix product plus argpartition, so a whole batch is scored at once.
+"""
+
+from typing import Any, Dict, List, NamedTuple
+import json
+import os
+import tempfile
+import numpy as np
+from app.services.embeddings import get_embedder, normalize_rows
+
+
+class VectorDocument(NamedTuple):
+    """One search hit, shaped like a LangChain Document plus its score"""
+    page_content: str
+    metadata: Dict[str, Any]
+    score: float
+
+
+def ipc_document(section: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the stored text and metadata for one ipc_chunks_final.json entry."""
+    number = str(section.get("section_number", section.get("section", "")))
+    title = section.get("section_title", section.get("description", ""))
+    law_text = section.get("law_text", "") or f"{title}. Punishment: {section.get('punishment', 'Not specified')}"
+    return {
+        "text": f"Section {number}: {title}. {law_text}",
+        "metadata": {"section": number, "description": title}
+    }
+
+
+def _atomic_write(path: str, write) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+class NumpyVectorStore:
+    """Read-only, memory-mapped embedding matrix with its sidecar metadata"""
+
+    def __init__(self, directory: str, collection: str):
+        """
+        Args:
+            directory: Folder holding <collection>.npy and <collection>.json
+            collection: Collection name
+
+        Raises:
+            FileNotFoundError: If the collection has not been written
+        """
+        self.matrix_path = os.path.join(directory, f"{collection}.npy")
+        self.meta_path = os.path.join(directory, f"{collection}.json")
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            sidecar = json.load(f)
+        self.model = sidecar["model"]
+        self.ids: List[str] = sidecar["ids"]
+        self.documents: List[str] = sidecar["documents"]
+        self.metadatas: List[Dict[str, Any]] = sidecar["metadatas"]
+        # Pages are faulted in on first use; opening costs no matrix reads
+        self.matrix = np.load(self.matrix_path, mmap_mode="r")
+        if self.matrix.shape[0] != len(self.ids):
+            raise ValueError(f"{self.matrix_path} has {self.matrix.shape[0]} rows for {len(self.ids)} ids")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def write(
+        directory: str,
+        collection: str,
+        model: str,
+        ids: List[str],
+        vectors: np.ndarray,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Write a collection, replacing any existing one atomically.
+        Rows are normalized here so search is a plain dot product.
+        """
+        os.makedirs(directory, exist_ok=True)
+        vectors = normalize_rows(vectors)
+        sidecar = {"model": model, "dim": int(vectors.shape[1]), "ids": ids, "documents": documents, "metadatas": metadatas}
+        _atomic_write(os.path.join(directory, f"{collection}.npy"), lambda f: np.save(f, vectors))
+        # The sidecar goes last: readers never see it ahead of its matrix
+        _atomic_write(
+            os.path.join(directory, f"{collection}.json"),
+            lambda f: f.write(json.dumps(sidecar, ensure_ascii=False).encode("utf-8"))
+        )
+
+    def search(self, queries: np.ndarray, k: int) -> List[List[VectorDocument]]:
+        """
+        Return the k most similar documents for each query vector.
+
+        Args:
+            queries: (n, dim) query embeddings, normalized
+            k: Hits per query
+
+        Returns:
+            One best-first list of hits per query
+        """
+        count = len(self.ids)
+        if count == 0:
+            return [[] for _ in range(len(queries))]
+        k = min(k, count)
+        scores = np.asarray(queries, dtype=np.float32) @ self.matrix.T
+        if k < count:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(count), (len(scores), count))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        results = []
+        for rows, row_scores in zip(np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)):
+            results.append([
+                VectorDocument(self.documents[i], self.metadatas[i], float(score))
+                for i, score in zip(rows, row_scores)
+            ])
+        return results
+
+
+class NumpyRetriever:
+    """Retriever over a NumpyVectorStore with the same call as the Chroma one"""
+
+    def __init__(self, store: NumpyVectorStore, k: int, embedder=None):
+        self.store = store
+        self.k = k
+        self.embedder = embedder or get_embedder(store.model)
+
+    def get_relevant_documents(self, query: str) -> List[VectorDocument]:
+        return self.batch_relevant_documents([query])[0]
+
+    def batch_relevant_documents(self, queries: List[str]) -> List[List[VectorDocument]]:
+        """Embed and search many queries with one matrix product."""
+        return self.store.search(self.embedder.embed_queries(queries), self.k)
+
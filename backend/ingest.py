@@ -0,0 +1,146 @@
+"""
+Ingest IPC sections into the vector store.
+
+    python ingest.py                      # incremental update of the configured store
+    python ingest.py --model hashing-1024 # local embeddings, no API key needed
+    python ingest.py --dry-run            # throughput benchmark against a fake embedder
+
+Batches are embedded concurrently; the concurrency limit grows while the
+API accepts requests and halves on every 429 (AIMD), so a run goes as fast
+as the quota allows without fixed sleeps. Re-runs only embed changed
+chunks and an interrupted run resumes from its checkpoint.
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import sys
+import threading
+import time
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.core.config import settings
+from app.services.embeddings import collection_name, get_embedder
+from app.services.ipc_index import IPC_DATA_PATH
+from app.services.ipc_ingest import (
+    AIMDLimiter,
+    ChromaIngestTarget,
+    NullIngestTarget,
+    NumpyIngestTarget,
+    ingest_sections_async
+)
+
+
+class FakeEmbedder:
+    """Sleeps like a remote API and answers 429 beyond a requests-per-minute quota"""
+
+    def __init__(self, latency_ms: float, requests_per_minute: int, dim: int = 768):
+        self.model_name = "fake"
+        self.latency = latency_ms / 1000
+        self.requests_per_minute = requests_per_minute
+        self.dim = dim
+        self._calls = collections.deque()
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0] > 60:
+                self._calls.popleft()
+            if self.requests_per_minute and len(self._calls) >= self.requests_per_minute:
+                raise Exception("429 RESOURCE_EXHAUSTED: fake quota exceeded")
+            self._calls.append(now)
+        time.sleep(self.latency)
+        return np.ones((len(texts), self.dim), dtype=np.float32)
+
+
+def load_sections(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    # Handle list vs dict structure
+    return data if isinstance(data, list) else data.get("sections", [])
+
+
+def print_progress(limiter: AIMDLimiter):
+    def report(done: int, total: int, elapsed: float) -> None:
+        rate = done / elapsed if elapsed else 0.0
+        eta = (total - done) / rate if rate else 0.0
+        sys.stdout.write(
+            f"\r   {done}/{total} chunks | {rate:,.1f} docs/s | ETA {eta:,.0f}s | "
+            f"concurrency {int(limiter.limit)} | 429s {limiter.throttled}   "
+        )
+        sys.stdout.flush()
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Ingest IPC sections into the vector store")
+    parser.add_argument("--file", default=settings.ipc_data_path or IPC_DATA_PATH, help="IPC chunks JSON")
+    parser.add_argument("--backend", choices=["numpy", "chroma"], default=settings.vector_backend)
+    parser.add_argument("--model", default="", help="Embedding model, or hashing-<dim> for local embeddings")
+    parser.add_argument("--batch-size", type=int, default=settings.ingest_batch_size)
+    parser.add_argument("--concurrency", type=int, default=settings.ingest_initial_concurrency, help="Starting concurrency")
+    parser.add_argument("--max-concurrency", type=int, default=settings.ingest_max_concurrency)
+    parser.add_argument("--dry-run", action="store_true", help="Benchmark against a fake embedder; nothing is written")
+    parser.add_argument("--fake-latency-ms", type=float, default=300.0)
+    parser.add_argument("--fake-rpm", type=int, default=300, help="Fake quota in requests per minute (0 = unlimited)")
+    parser.add_argument("--repeat", type=int, default=1, help="Dry run: multiply the corpus for a longer benchmark")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"❌ Error: File not found at {args.file}")
+        return 1
+    sections = load_sections(args.file)
+    print(f"✅ Loaded {len(sections)} sections from {args.file}")
+
+    if args.dry_run:
+        sections = [
+            {**section, "id": f"{section.get('id', 'IPC')}-{copy}"}
+            for copy in range(args.repeat)
+            for section in sections
+        ]
+        embedder = FakeEmbedder(args.fake_latency_ms, args.fake_rpm)
+        target = NullIngestTarget()
+        location = "nowhere (dry run)"
+    else:
+        # Cached texts are never re-embedded, so re-ingests and model switches are cheap
+        embedder = get_embedder(args.model, rate_limited=False)
+        collection = collection_name(settings.ipc_collection, embedder.model_name)
+        if args.backend == "chroma":
+            import chromadb
+            os.environ["ANONYMIZED_TELEMETRY"] = "False"
+            target = ChromaIngestTarget(chromadb.PersistentClient(path=settings.chroma_path), collection)
+            location = f"{settings.chroma_path} ({collection})"
+        else:
+            target = NumpyIngestTarget(settings.vector_store_dir, collection, embedder.model_name)
+            location = f"{settings.vector_store_dir} ({collection})"
+        if target.resumed:
+            print(f"↩️ Resuming: {target.resumed} chunks already embedded by an interrupted run")
+
+    limiter = AIMDLimiter(args.concurrency, args.max_concurrency)
+    print(f"⏳ Ingesting with {embedder.model_name} in batches of {args.batch_size}...")
+    result = asyncio.run(ingest_sections_async(
+        sections,
+        target,
+        embedder,
+        args.batch_size,
+        limiter,
+        print_progress(limiter),
+        settings.ingest_max_retries
+    ))
+    print()
+    print(
+        f"🎉 Done in {result['seconds']:.1f}s ({result['docs_per_second']:,.1f} docs/s): "
+        f"{result['embedded']} embedded, {result['unchanged']} unchanged, {result['deleted']} deleted "
+        f"in {location}; {result['throttled']} throttled requests, final concurrency {result['concurrency']}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
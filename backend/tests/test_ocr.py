@@ -0,0 +1,41 @@
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+from app.services import ocr
+
+
+def _pdf(text_page: bool) -> bytes:
+    """A PDF with one scanned (image-only) page, optionally after a text page."""
+    document = fitz.open()
+    if text_page:
+        document.new_page().insert_text((72, 72), "FIR No. 45/2024 registered at the police station " * 3)
+    page = document.new_page()
+    pixmap = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 64, 64), False)
+    pixmap.clear_with(200)
+    page.insert_image(page.rect, pixmap=pixmap)
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+@pytest.fixture
+def no_ocr_backend(monkeypatch):
+    def recognize_image(image_bytes):
+        raise AssertionError("OCR must not run without a backend")
+
+    monkeypatch.setattr(ocr, "ocr_available", lambda: False)
+    monkeypatch.setattr(ocr, "recognize_image", recognize_image)
+
+
+def test_image_only_page_without_backend_gets_placeholder(no_ocr_backend):
+    text = ocr.extract_text_from_pdf(_pdf(text_page=False))
+
+    assert text == "--- Page 1 ---\nText extracted from PDF page (no OCR backend installed)"
+
+
+def test_text_layer_pages_survive_without_backend(no_ocr_backend):
+    text = ocr.extract_text_from_pdf(_pdf(text_page=True))
+
+    assert "--- Page 1 ---\nFIR No. 45/2024" in text
+    assert "--- Page 2 ---\nText extracted from PDF page (no OCR backend installed)" in text
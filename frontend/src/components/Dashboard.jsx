@@ -1,7 +1,7 @@
 import React from "react";
 import FileUpload from "./FileUpload";
 import DiffView from "./DiffView";
-import { analyzeDocuments } from "../services/api";
+import { analyzeDocuments, getEvidenceStatus } from "../services/api";
 import { BookOpen, FileText, AlertTriangle, CheckCircle, Clock, Users, Shield } from 'lucide-react';
 
 const Dashboard = ({ onAnalysisComplete }) => {
@@ -9,6 +9,12 @@ const Dashboard = ({ onAnalysisComplete }) => {
   const [witnessText, setWitnessText] = React.useState("");
   const [loading, setLoading] = React.useState(false);
   const [error, setError] = React.useState(null);
+  // Bumped by each analysis and on unmount so an older poll stops reporting
+  const pollGeneration = React.useRef(0);
+
+  React.useEffect(() => () => {
+    pollGeneration.current += 1;
+  }, []);
 
   const handleFileUpload = async (files) => {
     try {
@@ -38,13 +44,18 @@ const Dashboard = ({ onAnalysisComplete }) => {
       return;
     }
 
+    const generation = ++pollGeneration.current;
     try {
       setLoading(true);
       setError(null);
       const result = await analyzeDocuments(firText, witnessText);
+      if (generation !== pollGeneration.current) return;
       if (onAnalysisComplete) {
         onAnalysisComplete(result, firText, witnessText);
       }
+      if (result?.evidence_id) {
+        pollEvidence(generation, result, firText, witnessText);
+      }
     } catch (err) {
       setError("Failed to analyze documents: " + err.message);
     } finally {
@@ -52,6 +63,32 @@ const Dashboard = ({ onAnalysisComplete }) => {
     }
   };
 
+  // Evidence is anchored in the background; report each status change until it is confirmed or failed
+  const pollEvidence = async (generation, result, fir, witness, attempts = 200) => {
+    let last = `${result.evidence_status}:${result.tx_hash}`;
+    for (let i = 0; i < attempts; i++) {
+      await new Promise((resolve) => setTimeout(resolve, 3000));
+      if (generation !== pollGeneration.current) return;
+      try {
+        const { evidence } = await getEvidenceStatus(result.evidence_id);
+        if (generation !== pollGeneration.current) return;
+        const current = `${evidence.status}:${evidence.tx_hash || null}`;
+        if (current !== last && onAnalysisComplete) {
+          last = current;
+          onAnalysisComplete({
+            ...result,
+            tx_hash: evidence.tx_hash || null,
+            evidence_status: evidence.status,
+            stored_on_blockchain: ["mined", "confirmed"].includes(evidence.status),
+          }, fir, witness);
+        }
+        if (["confirmed", "failed"].includes(evidence.status)) return;
+      } catch (err) {
+        return;
+      }
+    }
+  };
+
   const handleClear = () => {
     setFirText("");
     setWitnessText("");
@@ -50,6 +50,14 @@ const DiffView = ({ analysis, firText, witnessText }) => {
        doc.setFontSize(10);
        doc.setTextColor(128); // Grey
        doc.text(`Blockchain Transaction Hash: ${analysis.tx_hash}`, 20, 280);
+    } else if (analysis?.evidence_id) {
+       // Anchoring is asynchronous; the digest identifies the report until the transaction lands
+       doc.setFontSize(10);
+       doc.setTextColor(128); // Grey
+       doc.text(`Evidence ID: ${analysis.evidence_id} (${analysis.evidence_status || "queued"})`, 20, 275);
+       if (analysis.evidence_digest) {
+          doc.text(`Evidence SHA-256: ${analysis.evidence_digest}`, 20, 280);
+       }
     }
 
     doc.save("Evidence_Analysis_Report.pdf");
@@ -54,6 +54,21 @@ export const analyzeDocuments = async (firText, witnessText) => {
   }
 };
 
+/**
+ * Get the blockchain status of queued evidence
+ * @param {string} evidenceId - Evidence ID returned by /analyze
+ * @returns {Promise} Evidence record with status, digest and, once sent, tx_hash
+ */
+export const getEvidenceStatus = async (evidenceId) => {
+  try {
+    const response = await api.get(`/evidence/${evidenceId}`);
+    return response.data;
+  } catch (error) {
+    console.error("Evidence status error:", error);
+    throw error;
+  }
+};
+
 /**
  * Compare two texts
  * @param {string} text1 - First text
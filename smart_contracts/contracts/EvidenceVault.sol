@@ -2,13 +2,44 @@
 pragma solidity ^0.8.19;
 
 contract EvidenceVault {
-    string private evidence;
+    // SHA-256 digest of an evidence report => block timestamp it was registered at
+    mapping(bytes32 => uint256) public digestRegisteredAt;
 
-    function storeEvidence(string memory _evidence) public {
-        evidence = _evidence;
+    // Merkle root of a batch of evidence digests => block timestamp it was anchored at
+    mapping(bytes32 => uint256) public rootAnchoredAt;
+
+    event DigestRegistered(bytes32 indexed digest, address indexed registrar, uint256 timestamp);
+    event RootAnchored(bytes32 indexed root, uint256 leafCount, uint256 timestamp);
+
+    function registerDigest(bytes32 digest) public {
+        require(digestRegisteredAt[digest] == 0, "Digest already registered");
+        digestRegisteredAt[digest] = block.timestamp;
+        emit DigestRegistered(digest, msg.sender, block.timestamp);
+    }
+
+    function verifyDigest(bytes32 digest) public view returns (bool registered, uint256 timestamp) {
+        timestamp = digestRegisteredAt[digest];
+        registered = timestamp != 0;
+    }
+
+    function anchorRoot(bytes32 root, uint256 leafCount) public {
+        require(rootAnchoredAt[root] == 0, "Root already anchored");
+        rootAnchoredAt[root] = block.timestamp;
+        emit RootAnchored(root, leafCount, block.timestamp);
     }
 
-    function getEvidence() public view returns (string memory) {
-        return evidence;
+    // Sorted-pair Merkle proof check against an anchored root
+    function verifyLeaf(bytes32 root, bytes32 leaf, bytes32[] calldata proof) public view returns (bool) {
+        if (rootAnchoredAt[root] == 0) {
+            return false;
+        }
+        bytes32 node = leaf;
+        for (uint256 i = 0; i < proof.length; i++) {
+            bytes32 sibling = proof[i];
+            node = node < sibling
+                ? keccak256(abi.encodePacked(node, sibling))
+                : keccak256(abi.encodePacked(sibling, node));
+        }
+        return node == root;
     }
 }